@@ -0,0 +1,158 @@
+# adaptive.py
+import os
+import time
+
+from PySide6.QtCore import QObject, QTimer
+
+
+def _rss_bytes():
+    """Resident set size of this process, or None if unknown."""
+    if os.name == "nt":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class AdaptiveController(QObject):
+    """
+    Slows spawning down while the machine is struggling.
+
+    A probe timer on the UI thread measures event-loop lag (how late the
+    probe fires), UI-thread busy time (thread CPU time / wall time) and
+    process RSS, each smoothed. Whenever one of them exceeds its target
+    the spawn interval is stretched and the number of live overlays is
+    capped; once everything is back under target the stretch decays
+    gradually.
+
+    Settings live in config["adaptive"].
+    """
+
+    PROBE_MS = 100
+    RSS_EVERY = 10          # probes between RSS reads
+    SMOOTHING = 0.2         # EMA weight of a new sample
+    STRETCH_GAIN = 0.25
+    RECOVERY = 0.97         # stretch multiplier per probe when under target
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+
+        self.lag_ms = 0.0
+        self.busy = 0.0
+        self.rss_mb = None
+        self.stretch = 1.0
+
+        self._probes = 0
+        self._last_wall = None
+        self._last_cpu = None
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._probe)
+        self.apply_config()
+
+    def _settings(self):
+        return self.config.get("adaptive", {})
+
+    @property
+    def enabled(self):
+        return self._settings().get("enabled", False)
+
+    def apply_config(self):
+        if self.enabled and not self.timer.isActive():
+            self._last_wall = None
+            self.timer.start(self.PROBE_MS)
+        elif not self.enabled:
+            self.timer.stop()
+            self.stretch = 1.0
+
+    # ---------- outputs ----------
+
+    def interval_factor(self):
+        return self.stretch if self.enabled else 1.0
+
+    def max_active(self):
+        """Live overlay cap, or None when uncapped."""
+        settings = self._settings()
+        if not self.enabled or "max_active" not in settings:
+            return None
+        return max(settings.get("min_active", 1), int(settings["max_active"] / self.stretch))
+
+    def state(self):
+        return {
+            "enabled": self.enabled,
+            "lag_ms": round(self.lag_ms, 2),
+            "busy": round(self.busy, 3),
+            "rss_mb": None if self.rss_mb is None else round(self.rss_mb, 1),
+            "interval_factor": round(self.interval_factor(), 3),
+            "max_active": self.max_active(),
+            "settings": dict(self._settings()),
+        }
+
+    # ---------- probe ----------
+
+    def _smooth(self, old, new):
+        return old + (new - old) * self.SMOOTHING
+
+    def _probe(self):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+
+        if self._last_wall is not None:
+            elapsed = wall - self._last_wall
+            lag = max(0.0, elapsed * 1000 - self.PROBE_MS)
+            busy = (cpu - self._last_cpu) / elapsed if elapsed > 0 else 0.0
+
+            self.lag_ms = self._smooth(self.lag_ms, lag)
+            self.busy = self._smooth(self.busy, min(1.0, busy))
+
+        self._last_wall = wall
+        self._last_cpu = cpu
+
+        if self._probes % self.RSS_EVERY == 0:
+            rss = _rss_bytes()
+            self.rss_mb = None if rss is None else rss / (1024 * 1024)
+        self._probes += 1
+
+        self._update_stretch()
+
+    def _update_stretch(self):
+        settings = self._settings()
+
+        pressure = max(
+            self.lag_ms / max(1e-6, settings.get("lag_target_ms", 40)),
+            self.busy / max(1e-6, settings.get("busy_target", 0.6)),
+            (self.rss_mb or 0) / max(1e-6, settings.get("rss_target_mb", 1500)),
+        )
+
+        if pressure > 1.0:
+            self.stretch *= 1 + self.STRETCH_GAIN * min(pressure - 1.0, 1.0)
+        else:
+            self.stretch *= self.RECOVERY
+
+        self.stretch = max(1.0, min(settings.get("max_stretch", 6.0), self.stretch))
@@ -0,0 +1,271 @@
+# animation.py
+import time
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QTimer, QSize, Qt
+from PySide6.QtGui import QImageReader, QPixmap
+
+
+# =========================
+# Shared clock
+# =========================
+
+class AnimationClock(QObject):
+    """
+    One timer for every animation in the process.
+
+    Subscribers get `tick(now_ms)` on each beat; the timer only runs while
+    someone is subscribed.
+    """
+
+    INTERVAL_MS = 10
+
+    def __init__(self):
+        super().__init__()
+        self.subscribers = set()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._on_tick)
+
+    @staticmethod
+    def now_ms():
+        return time.monotonic() * 1000
+
+    def subscribe(self, subscriber):
+        self.subscribers.add(subscriber)
+        if not self.timer.isActive():
+            self.timer.start(self.INTERVAL_MS)
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+        if not self.subscribers:
+            self.timer.stop()
+
+    def _on_tick(self):
+        now = self.now_ms()
+        for subscriber in list(self.subscribers):
+            subscriber.tick(now)
+
+
+_clock = None
+
+
+def shared_clock():
+    global _clock
+    if _clock is None:
+        _clock = AnimationClock()
+    return _clock
+
+
+# =========================
+# Frame cache
+# =========================
+
+def _frame_delay(reader):
+    # Browsers treat tiny delays as "unspecified"; so do we
+    delay = reader.nextImageDelay()
+    return delay if delay > 10 else 100
+
+
+class SharedAnimation:
+    """
+    Decoded, scaled frames of one (file, size bucket), shared by every
+    overlay showing it. Frames are decoded on first use and reported to
+    `on_grow(animation)`; once the animation grows past `max_bytes`, or the
+    cache releases it, it is marked `streaming` and players switch to
+    decoding on their own.
+    """
+
+    def __init__(self, path, size, max_bytes, on_grow=None):
+        self.path = path
+        self.size = size
+        self.max_bytes = max_bytes
+        self.on_grow = on_grow
+
+        self.frames = []
+        self.nbytes = 0
+        self.complete = False
+        self.streaming = False
+
+        self._reader = QImageReader(path)
+        self._reader.setScaledSize(size)
+
+    def frame(self, index):
+        """returns: (QPixmap, delay_ms) or None past the last frame"""
+        while index >= len(self.frames) and not self.complete and not self.streaming:
+            self._decode_next()
+        if index < len(self.frames):
+            return self.frames[index]
+        return None
+
+    def _decode_next(self):
+        if not self._reader.canRead():
+            self._finish()
+            return
+
+        image = self._reader.read()
+        if image.isNull():
+            self._finish()
+            return
+
+        pix = QPixmap.fromImage(image)
+        self.frames.append((pix, _frame_delay(self._reader)))
+        self.nbytes += pix.width() * pix.height() * 4
+
+        if self.nbytes > self.max_bytes:
+            self.release()
+        elif self.on_grow:
+            self.on_grow(self)
+
+    def release(self):
+        """Drop the decoded frames; players still showing it stream instead."""
+        self.streaming = True
+        self.frames = []
+        self.nbytes = 0
+        self._reader = None
+
+    def _finish(self):
+        self.complete = True
+        self._reader = None
+
+
+class FrameCache:
+    """
+    LRU of SharedAnimation, bounded by total decoded bytes. The bound is
+    checked on every decoded frame; evicted animations are released, so
+    overlays still playing them stop holding their frames.
+    """
+
+    def __init__(self, max_bytes, per_animation_bytes):
+        self.max_bytes = max_bytes
+        self.per_animation_bytes = per_animation_bytes
+        self.entries = OrderedDict()
+
+    def get(self, path, size, key=None):
+        """`key` identifies the content (e.g. a content hash); defaults to path."""
+        key = (key or path, size.width(), size.height())
+        animation = self.entries.get(key)
+
+        # Streaming entries stay cached too, so the next overlay streams
+        # straight away instead of decoding up to the cap again
+        if animation is not None:
+            self.entries.move_to_end(key)
+            return animation
+
+        animation = SharedAnimation(
+            path, size, min(self.per_animation_bytes, self.max_bytes), on_grow=self._evict
+        )
+        self.entries[key] = animation
+        return animation
+
+    def nbytes(self):
+        return sum(a.nbytes for a in self.entries.values())
+
+    def _evict(self, growing):
+        """Release least recently used animations other than `growing` until under the cap."""
+        total = self.nbytes()
+        for key, animation in list(self.entries.items()):
+            if total <= self.max_bytes:
+                break
+            # Streaming entries hold no frames; keep them as a marker
+            if animation is growing or not animation.nbytes:
+                continue
+            total -= animation.nbytes
+            del self.entries[key]
+            animation.release()
+
+
+_cache = None
+
+
+def frame_cache(config):
+    global _cache
+    if _cache is None:
+        limits = config.get("animation", {})
+        _cache = FrameCache(
+            limits.get("cache_mb", 256) * 1024 * 1024,
+            limits.get("per_animation_mb", 64) * 1024 * 1024,
+        )
+    return _cache
+
+
+def size_bucket(size, step=32):
+    """Round a target size so nearby sizes share one set of frames."""
+    width = max(step, round(size.width() / step) * step)
+    height = max(1, round(size.height() * width / max(1, size.width())))
+    return QSize(width, height)
+
+
+# =========================
+# Player
+# =========================
+
+class AnimationPlayer:
+    """
+    Shows the frames of an animation on a QLabel, driven by the shared clock.
+    """
+
+    def __init__(self, label, animation):
+        self.label = label
+        self.animation = animation
+        self.index = 0
+        self.next_due = 0.0
+        self._delay = 100
+
+        self._reader = None
+        if animation.streaming:
+            self._start_streaming()
+
+    def first_frame(self):
+        frame = self._next_frame()
+        return frame[0] if frame else QPixmap()
+
+    def start(self):
+        self.next_due = AnimationClock.now_ms() + self._delay
+        shared_clock().subscribe(self)
+
+    def stop(self):
+        shared_clock().unsubscribe(self)
+
+    def _start_streaming(self):
+        self._reader = QImageReader(self.animation.path)
+        self._reader.setScaledSize(self.animation.size)
+
+    def _next_frame(self):
+        """returns: (QPixmap, delay_ms) or None"""
+        if self._reader is None:
+            frame = self.animation.frame(self.index)
+
+            if self.animation.streaming:
+                # Too large to share: decode privately from the first frame
+                self._start_streaming()
+            else:
+                if frame is None and self.index > 0:
+                    self.index = 0
+                    frame = self.animation.frame(0)
+
+                self.index += 1
+                if frame:
+                    self._delay = frame[1]
+                return frame
+
+        if not self._reader.canRead():
+            self._start_streaming()
+
+        image = self._reader.read()
+        if image.isNull():
+            return None
+
+        self._delay = _frame_delay(self._reader)
+        return QPixmap.fromImage(image), self._delay
+
+    def tick(self, now):
+        if now < self.next_due:
+            return
+
+        frame = self._next_frame()
+        if frame:
+            self.label.setPixmap(frame[0])
+
+        # Stay on schedule, but never try to catch up on a backlog of frames
+        self.next_due = max(self.next_due + self._delay, now)
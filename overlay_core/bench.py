@@ -0,0 +1,326 @@
+# bench.py
+#
+# Micro-benchmarks for the overlay core.
+# Run from this directory:  python bench.py [name ...]
+import json
+import os
+import random
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+
+from packed import PackedTable, path_id
+from pathstore import PathStore
+from placement import SpatialGrid, POSITION_POLICIES
+
+
+def _synthetic_paths(count, depth=6, files_per_dir=200):
+    root = os.path.join(os.sep, "media", "library", "collections")
+    directory = root
+    for i in range(count):
+        if i % files_per_dir == 0:
+            parts = [f"folder_{random.randint(0, 999):03d}_with_a_long_name" for _ in range(depth)]
+            directory = os.path.join(root, *parts)
+        yield directory, f"IMG_{i:08d}_exported_from_camera.jpg"
+
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return result, size
+
+
+def bench_path_storage(count=500_000):
+    paths = list(_synthetic_paths(count))
+
+    def build_list():
+        return [os.path.join(d, f) for d, f in paths]
+
+    def build_store():
+        store = PathStore()
+        for d, f in paths:
+            store.add(d, f)
+        return store
+
+    print(f"path storage ({count} entries)")
+    for label, build in (("list[str]", build_list), ("PathStore", build_store)):
+        pool, size = _measure(build)
+
+        start = time.perf_counter()
+        for _ in range(100_000):
+            random.choice(pool)
+        choose_us = (time.perf_counter() - start) * 1e6 / 100_000
+
+        print(f"  {label:<10} {size / count:8.1f} bytes/entry   choose {choose_us:.2f} us")
+
+    # What a MediaLibrary actually holds per file: the PathStore plus the
+    # side indexes, which are packed records keyed by path id
+    from content import ContentIndex
+    from probe import MetadataIndex
+
+    store, store_size = _measure(build_store)
+    ids = [path_id(os.path.join(d, f)) for d, f in paths]
+    seen = array("Q", sorted(ids))
+
+    def load_table(name, fmt, record):
+        table = PackedTable(Path(tmp) / name, fmt)
+        for i, key in enumerate(ids):
+            table.put(key, record(i))
+        table.compact(seen)
+
+        # Measured as a restarted library holds it: loaded from disk
+        def load():
+            loaded = PackedTable(table.path, fmt)
+            loaded.load()
+            return loaded
+        return _measure(load)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        meta, meta_size = load_table(
+            "metadata.idx", MetadataIndex.RECORD,
+            lambda i: (4000, 3000, 1, 0, 1700000000.0 + i, 2_000_000 + i),
+        )
+        content, content_size = load_table(
+            "content.idx", ContentIndex.RECORD,
+            lambda i: (1700000000.0 + i, 2_000_000 + i, i.to_bytes(16, "little"), ContentIndex.NO_FULL),
+        )
+
+    print("  library per entry (PathStore + side indexes)")
+    for label, size in (
+        ("PathStore", store_size),
+        ("metadata", meta_size),
+        ("content", content_size),
+        ("total", store_size + meta_size + content_size),
+    ):
+        print(f"    {label:<10} {size / count:8.1f} bytes/entry")
+
+
+def _write_image_tree(root, count, files_per_dir=500):
+    from PySide6.QtCore import QBuffer, QByteArray
+    from PySide6.QtGui import QImage, QColor
+
+    image = QImage(640, 480, QImage.Format_RGB32)
+    image.fill(QColor(40, 120, 200))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QBuffer.WriteOnly)
+    image.save(buffer, "PNG")
+    png = bytes(data)
+
+    for i in range(count):
+        directory = os.path.join(root, f"dir_{i // files_per_dir:04d}")
+        if i % files_per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"img_{i:07d}.png"), "wb") as f:
+            f.write(png)
+
+
+def _write_warm_indexes(library_dir, media_root, entries):
+    """
+    The metadata and content indexes as a previous session leaves them:
+    every library file probed and hashed, padded to `entries` records
+    (files of other folders) so loading them costs what a large library's
+    does. returns: {file name: contents}
+    """
+    from content import ContentIndex, full_hash, partial_hash
+    from probe import MetadataIndex
+
+    meta = PackedTable(library_dir / "metadata.idx", MetadataIndex.RECORD)
+    content = PackedTable(library_dir / "content.idx", ContentIndex.RECORD)
+    keys = []
+
+    for root, _, files in os.walk(media_root):
+        for f in files:
+            path = os.path.join(root, f)
+            st = os.stat(path)
+            key = path_id(path)
+            keys.append(key)
+            meta.put(key, (640, 480, 1, 0, st.st_mtime, st.st_size))
+            content.put(key, (st.st_mtime, st.st_size, partial_hash(path), full_hash(path)))
+
+    for i in range(len(keys), entries):
+        key = path_id(os.path.join(os.sep, "archive", f"dir_{i // 500:05d}", f"img_{i:08d}.jpg"))
+        keys.append(key)
+        meta.put(key, (4000, 3000, 1, 0, 1700000000.0 + i, 2_000_000 + i))
+        content.put(key, (1700000000.0 + i, 2_000_000 + i, ContentIndex.NO_PARTIAL, ContentIndex.NO_FULL))
+
+    seen = array("Q", sorted(keys))
+    for table in (meta, content):
+        table.compact(seen)
+    return {table.path.name: table.path.read_bytes() for table in (meta, content)}
+
+
+def bench_startup(files=20_000, runs=3, index_entries=500_000):
+    """
+    Phase breakdown and time-to-first-overlay of the real main.py, with
+    warm indexes of `index_entries` records restored before every run.
+    """
+    with tempfile.TemporaryDirectory() as home:
+        media_root = os.path.join(home, "media")
+        _write_image_tree(media_root, files)
+
+        config_dir = os.path.join(home, ".config", "DesktopOverlayManager")
+        os.makedirs(config_dir)
+        with open(os.path.join(config_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"media_folders": [media_root]}, f)
+
+        library_dir = Path(config_dir) / "library"
+        indexes = _write_warm_indexes(library_dir, media_root, index_entries)
+
+        env = dict(os.environ, HOME=home, USERPROFILE=home, APPDATA=os.path.join(home, ".config"))
+
+        phases = {}
+        for _ in range(runs):
+            # A run's refresh drops the padding records; start each one warm
+            for name, data in indexes.items():
+                (library_dir / name).write_bytes(data)
+
+            out = subprocess.run(
+                [sys.executable, "main.py", "--startup-benchmark"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env=env, capture_output=True, text=True, timeout=120,
+            ).stdout
+
+            for line in out.splitlines():
+                if line.startswith("[Startup]"):
+                    _, name, at = line.split()[:3]
+                    phases.setdefault(name, []).append(float(at))
+
+    print(f"startup ({files} images, {index_entries} indexed, median of {runs} runs)")
+    for name, values in sorted(phases.items(), key=lambda p: statistics.median(p[1])):
+        print(f"  {name:<14} {statistics.median(values):9.1f} ms")
+    if "first_overlay" not in phases:
+        print("  first overlay was never shown")
+
+
+def bench_placement(live=300, spawns=20_000):
+    from PySide6.QtCore import QRect
+
+    geo = QRect(0, 0, 3840, 2160)
+    print(f"placement ({live} live overlays on {geo.width()}x{geo.height()})")
+
+    for name, policy in POSITION_POLICIES.items():
+        grid = SpatialGrid()
+        live_keys = []
+        overlap = 0
+        elapsed = 0.0
+
+        for i in range(spawns):
+            w, h = random.randint(150, 900), random.randint(150, 700)
+
+            start = time.perf_counter()
+            x, y = policy(grid, geo, w, h, 16)
+            elapsed += time.perf_counter() - start
+
+            overlap += grid.overlap(x, y, w, h) / (w * h)
+            grid.insert(i, x, y, w, h)
+            live_keys.append(i)
+            if len(live_keys) > live:
+                grid.remove(live_keys.pop(0))
+
+        print(f"  {name:<14} {elapsed * 1e6 / spawns:8.1f} us/spawn   mean overlap {overlap / spawns:.2f}x own area")
+
+
+def bench_fades(count=200, ticks=500):
+    """Cost of one shared fade tick with `count` overlays fading at once."""
+    from PySide6.QtWidgets import QApplication, QWidget
+    from fades import FadeDriver
+
+    app = QApplication.instance() or QApplication([])
+    config = {"opacity": 0.5, "fade": {"in_ms": 10_000, "out_ms": 10_000}}
+    widgets = [QWidget() for _ in range(count)]
+
+    print(f"fades ({count} simultaneous)")
+    for label, apply in (
+        ("driver only", lambda overlay, opacity: None),
+        ("per-window", None),
+    ):
+        driver = FadeDriver(config, apply=apply)
+        for widget in widgets:
+            driver.fade_in(widget)
+
+        start = time.perf_counter()
+        now = time.monotonic() * 1000
+        for i in range(ticks):
+            driver.tick(now + i)
+        elapsed = time.perf_counter() - start
+
+        for widget in widgets:
+            driver.cancel(widget)
+        print(f"  {label:<12} {elapsed * 1e6 / ticks:8.1f} us/tick")
+
+
+
+def _box(kind, payload):
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+
+def _write_mp4(path, brand, version, width, height, duration_ms, mdia_bytes):
+    """Minimal spec-conformant MP4/MOV header: ftyp + moov(mvhd, trak(tkhd, mdia))."""
+    if version == 1:
+        mvhd = struct.pack(">B3xQQIQ", 1, 0, 0, 1000, duration_ms) + bytes(80)
+        tkhd = struct.pack(">B3xQQI4xQ8x", 1, 0, 0, 1, duration_ms)
+    else:
+        mvhd = struct.pack(">B3xIIII", 0, 0, 0, 1000, duration_ms) + bytes(80)
+        tkhd = struct.pack(">B3xIII4xI8x", 0, 0, 0, 1, duration_ms)
+    tkhd += bytes(8) + bytes(36) + struct.pack(">II", width << 16, height << 16)
+
+    trak = _box(b"trak", _box(b"tkhd", tkhd) + _box(b"mdia", bytes(mdia_bytes)))
+    moov = _box(b"moov", _box(b"mvhd", mvhd) + trak)
+    with open(path, "wb") as f:
+        f.write(_box(b"ftyp", brand + bytes(4) + brand) + moov)
+
+
+def bench_probe(runs=2000):
+    """Check header probes against known container layouts, then time them."""
+    from probe import probe_file
+
+    cases = [
+        # tkhd v0/v1; an mdia over 64 KB used to be misread as the height
+        ("v0.mp4", b"isom", 0, 1920, 1080, 5000, 70_000),
+        ("v0_small.mp4", b"isom", 0, 1280, 720, 2500, 512),
+        ("v1.mov", b"qt  ", 1, 3840, 2160, 90_000, 70_000),
+    ]
+
+    print(f"probe ({runs} runs per file)")
+    with tempfile.TemporaryDirectory() as root:
+        for name, brand, version, width, height, duration_ms, mdia_bytes in cases:
+            path = os.path.join(root, name)
+            _write_mp4(path, brand, version, width, height, duration_ms, mdia_bytes)
+
+            info = probe_file(path, "video")
+            expected = {"width": width, "height": height, "duration_ms": duration_ms}
+            if info != expected:
+                raise AssertionError(f"{name}: probed {info}, expected {expected}")
+
+            start = time.perf_counter()
+            for _ in range(runs):
+                probe_file(path, "video")
+            elapsed = (time.perf_counter() - start) * 1e6 / runs
+            print(f"  {name:<14} ok  {elapsed:8.1f} us/probe")
+
+
+BENCHMARKS = {
+    "path_storage": bench_path_storage,
+    "startup": bench_startup,
+    "placement": bench_placement,
+    "fades": bench_fades,
+    "probe": bench_probe,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -0,0 +1,110 @@
+# census.py
+import gc
+import time
+import weakref
+
+import shiboken6
+from PySide6.QtCore import QObject, QTimer
+
+from animation import frame_cache
+
+
+class OverlayTracker(QObject):
+    """
+    Weak registry of every overlay the manager created.
+
+    Overlays are expected to be collected shortly after `closed`. A periodic
+    report flags overlays that were closed more than GRACE_S ago but whose
+    Python wrapper is still reachable (something holds a reference) or
+    whose native object was never deleted.
+    """
+
+    REPORT_MS = 60_000
+    GRACE_S = 15
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        self.records = {}   # id -> {"ref", "created", "closed", "info"}
+        self.created_total = 0
+        self.collected_total = 0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.report)
+        self.timer.start(self.REPORT_MS)
+
+    def track(self, overlay):
+        key = id(overlay)
+        self.records[key] = {
+            "ref": weakref.ref(overlay, lambda _, key=key: self._on_collected(key)),
+            "created": time.time(),
+            "closed": None,
+            "info": {"path": overlay.path, "media_type": overlay.media_type},
+        }
+        self.created_total += 1
+
+    def closed(self, overlay):
+        record = self.records.get(id(overlay))
+        if record:
+            record["closed"] = time.time()
+
+    def _on_collected(self, key):
+        if self.records.pop(key, None) is not None:
+            self.collected_total += 1
+
+    def _entry(self, record, now):
+        overlay = record["ref"]()
+        native = overlay is not None and shiboken6.isValid(overlay)
+
+        entry = dict(record["info"])
+        entry["age_s"] = round(now - record["created"], 1)
+        entry["closed_s"] = None if record["closed"] is None else round(now - record["closed"], 1)
+        entry["native_alive"] = native
+        if native:
+            entry.update(overlay.resources())
+        return entry
+
+    def leaks(self):
+        now = time.time()
+        return [
+            self._entry(record, now)
+            for record in list(self.records.values())
+            if record["closed"] is not None and now - record["closed"] > self.GRACE_S
+        ]
+
+    def census(self):
+        now = time.time()
+        entries = [self._entry(record, now) for record in list(self.records.values())]
+        live = [e for e in entries if e["closed_s"] is None]
+
+        types = {}
+        for obj in gc.get_objects():
+            name = type(obj).__name__
+            if name in ("MediaOverlay", "QMediaPlayer", "QAudioOutput", "QVideoWidget", "QPixmap"):
+                types[name] = types.get(name, 0) + 1
+
+        return {
+            "created_total": self.created_total,
+            "collected_total": self.collected_total,
+            "tracked": len(entries),
+            "live": len(live),
+            "leaked": len([e for e in entries if e["closed_s"] is not None and e["closed_s"] > self.GRACE_S]),
+            "pixmap_bytes": sum(e.get("pixmap_bytes", 0) for e in live),
+            "frame_cache_bytes": frame_cache(self.config).nbytes(),
+            "players": sum(1 for e in live if e.get("player")),
+            "native_windows": sum(1 for e in live if e.get("native_window")),
+            "python_objects": types,
+            "overlays": entries,
+        }
+
+    def report(self):
+        leaks = self.leaks()
+        if not leaks:
+            return
+
+        print(f"[Census] {len(leaks)} closed overlay(s) not collected:")
+        for leak in leaks:
+            print(
+                f"[Census]   {leak['media_type']} {leak['path']} closed {leak['closed_s']}s ago"
+                f" (native alive: {leak['native_alive']})"
+            )
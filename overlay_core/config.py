@@ -11,11 +11,15 @@ def get_config_path():
         base = Path.home() / ".config"
 
     config_dir = base / "DesktopOverlayManager"
-    config_dir.mkdir(parents=True, exist_ok=True)
 
     return config_dir / "config.json"
 
+# Directories are created on first write, not at import
+def get_library_dir():
+    return get_config_path().parent / "library"
+
 CONFIG_FILE = get_config_path()
+LIBRARY_DIR = get_library_dir()
 
 DEFAULT_CONFIG = {
     "opacity": 0.5,
@@ -31,6 +35,18 @@ DEFAULT_CONFIG = {
         "fullscreen_chance": 1,
     },
 
+    # Stretch spawn intervals and cap live overlays while the UI thread
+    # lags, is busy, or memory is high
+    "adaptive": {
+        "enabled": False,
+        "lag_target_ms": 40,
+        "busy_target": 0.6,
+        "rss_target_mb": 1500,
+        "max_stretch": 6.0,
+        "max_active": 60,
+        "min_active": 4,
+    },
+
     "media": {
         "image": {
             "enabled": True,
@@ -77,12 +93,73 @@ DEFAULT_CONFIG = {
         },
     },
 
+    "fade": {
+        "in_ms": 250,
+        "out_ms": 400,
+    },
+
     "scale": {
         "min": 0.4,
         "max": 2.0,
     },
 
-    "media_folders": []
+    "media_folders": [],
+
+    # Live selection filters over folder / tag / ext / size,
+    # e.g. {"include": {"tag": ["party"]}, "exclude": {"folder": ["C:/media/old"]}}
+    "filters": {
+        "include": {},
+        "exclude": {},
+    },
+
+    # Append spawn/close events to a trace for replay (spawntrace.py);
+    # file None -> spawn_trace.jsonl next to config.json
+    "trace": {
+        "enabled": False,
+        "file": None,
+    },
+
+    # One spawn scheduler per screen instead of the global timer. Interval
+    # and max_active scale with screen area / reference_area; overrides are
+    # keyed by screen id (serial number, else manufacturer|model), or by
+    # "id@x,y" to tell identical monitors apart
+    "screens": {
+        "per_screen": False,
+        "reference_area": 1920 * 1080,
+        "max_active": 8,
+        "on_remove": "close",   # "close" | "migrate" overlays of a removed screen
+        "overrides": {},
+    },
+
+    "placement": {
+        "policy": "least_overlap",  # "random" | "least_overlap"
+        "screen": "area",           # "area" (weighted by screen area) | "uniform"
+        "candidates": 16,
+    },
+
+    # Decoded GIF/WebP frames shared between overlays; animations larger
+    # than per_animation_mb are decoded frame by frame instead
+    "animation": {
+        "cache_mb": 256,
+        "per_animation_mb": 64,
+    },
+
+    # Identical files in several folders count (and are cached) once
+    "dedup": {
+        "enabled": True,
+    },
+
+    # Pre-scaled image variants kept on disk between runs
+    "renditions": {
+        "enabled": True,
+        "max_mb": 2048,
+    },
+
+    "library": {
+        # "exact": enumerate everything before spawning
+        # "sample_first": spawn from a random tree walk while the index builds
+        "mode": "exact",
+    },
 
 }
 
@@ -97,6 +174,7 @@ def load_config():
 
 
 def save_config(config):
+    CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
     CONFIG_FILE.write_text(
         json.dumps(config, indent=4), encoding="utf-8"
     )
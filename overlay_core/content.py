@@ -0,0 +1,213 @@
+# content.py
+#
+# Hashing runs in a thread pool: hashlib and file reads release the GIL,
+# and unlike a process pool nothing re-imports the app (frozen builds).
+import hashlib
+import os
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+from packed import PackedTable, path_id
+
+PARTIAL_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+
+def partial_hash(path):
+    """Hash of the size plus the first and last PARTIAL_BYTES."""
+    h = hashlib.blake2b(digest_size=16)
+    size = os.path.getsize(path)
+    h.update(size.to_bytes(8, "little"))
+
+    with open(path, "rb") as f:
+        h.update(f.read(PARTIAL_BYTES))
+        if size > 2 * PARTIAL_BYTES:
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+            h.update(f.read(PARTIAL_BYTES))
+    return h.digest()
+
+
+def full_hash(path):
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _hash_job(job):
+    kind, path = job
+    try:
+        return path, (partial_hash(path) if kind == "partial" else full_hash(path))
+    except OSError:
+        return path, None
+
+
+class ContentIndex:
+    """
+    Persistent path -> content identity, used to collapse duplicate files.
+
+    Hashing is staged so that most files are never read: only files that
+    share their size with another file get a partial hash (first and last
+    PARTIAL_BYTES), and only files sharing size and partial hash get a
+    full hash. Entries are invalidated by (mtime, size), so unchanged files
+    are never hashed again. Entries are packed records keyed by path id
+    (PackedTable, about 60 bytes per file), read from disk by load() on
+    the scan or refresh thread.
+
+    key(path) is the content key used by caches: the full hash where one
+    was needed, else size + partial hash, else size + mtime for files whose
+    size is unique in the library (all unique within the library).
+    """
+
+    # mtime, size, partial hash, full hash; zero bytes = not hashed
+    RECORD = "<dQ16s20s"
+    NO_PARTIAL = bytes(16)
+    NO_FULL = bytes(20)
+
+    def __init__(self, index_file, workers=None):
+        self.index_file = index_file
+        self.workers = workers
+        self.table = PackedTable(index_file, self.RECORD)
+        self.groups = {}      # key -> [paths], only for keys with several paths
+        self.canonical = {}   # duplicate path -> path kept in the pool
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read the index from disk, once; call it off the UI thread."""
+        self.table.ensure_loaded()
+
+    # ---------- lookups ----------
+
+    def key(self, path):
+        record = self.table.get(path_id(path))
+        if record is None:
+            return None
+
+        mtime, size, partial, full = record
+        if full != self.NO_FULL:
+            return "h:" + full.hex()
+        if partial != self.NO_PARTIAL:
+            return f"p:{size}:{partial.hex()}"
+        return f"s:{size}:{mtime}"
+
+    def paths(self, path):
+        """Every known path with the same content as `path`."""
+        return self.groups.get(self.key(path), [path])
+
+    def is_duplicate(self, path):
+        return path in self.canonical
+
+    # ---------- building ----------
+
+    def refresh(self, pool, on_done=None):
+        """
+        Hash new/changed files in `pool` ({type: paths}) in a background
+        thread pool. `on_done()` is called from the worker thread once
+        the duplicate groups are up to date. A new call supersedes any
+        refresh still running.
+        """
+        self._generation += 1
+        threading.Thread(
+            target=self._run, args=(self._generation, pool, on_done), daemon=True
+        ).start()
+
+    def _records(self, paths):
+        for path in paths:
+            record = self.table.get(path_id(path))
+            if record is not None:
+                yield path, record
+
+    def _hash_all(self, executor, kind, paths, generation):
+        field = 2 if kind == "partial" else 3
+        for path, digest in executor.map(_hash_job, [(kind, p) for p in paths]):
+            if generation != self._generation:
+                return False
+            key = path_id(path)
+            record = self.table.get(key)
+            if digest is not None and record is not None:
+                record = list(record)
+                record[field] = digest
+                self.table.put(key, record)
+        return True
+
+    def _run(self, generation, pool, on_done):
+        self.load()
+        seen = array("Q")
+        sizes = array("q")   # per pool path, in pool order; -1 = gone
+
+        for paths in pool.values():
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    sizes.append(-1)
+                    continue
+
+                key = path_id(path)
+                seen.append(key)
+                sizes.append(st.st_size)
+
+                old = self.table.get(key)
+                if old is None or old[0] != st.st_mtime or old[1] != st.st_size:
+                    with self._lock:
+                        if generation != self._generation:
+                            return
+                        self.table.put(key, (st.st_mtime, st.st_size, self.NO_PARTIAL, self.NO_FULL))
+
+            if generation != self._generation:
+                return
+
+        # Size prefilter: a file with a unique size has no duplicate
+        ordered = sorted(size for size in sizes if size >= 0)
+        shared_sizes = {a for a, b in zip(ordered, ordered[1:]) if a == b}
+        del ordered
+        shared = [
+            path for path, size in zip(chain.from_iterable(pool.values()), sizes)
+            if size in shared_sizes
+        ]
+
+        need_partial = [p for p, record in self._records(shared) if record[2] == self.NO_PARTIAL]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if need_partial and not self._hash_all(executor, "partial", need_partial, generation):
+                return
+
+            by_partial = {}
+            for path, (mtime, size, partial, full) in self._records(shared):
+                if partial != self.NO_PARTIAL:
+                    by_partial.setdefault((size, partial), []).append(path)
+
+            need_full = [
+                p for paths in by_partial.values() if len(paths) > 1
+                for p, record in self._records(paths) if record[3] == self.NO_FULL
+            ]
+            if need_full and not self._hash_all(executor, "full", need_full, generation):
+                return
+
+        # Only fully hashed files can have copies
+        groups = {}
+        for path, record in self._records(shared):
+            if record[3] != self.NO_FULL:
+                groups.setdefault("h:" + record[3].hex(), []).append(path)
+
+        canonical = {}
+        for paths in groups.values():
+            paths.sort()
+            for duplicate in paths[1:]:
+                canonical[duplicate] = paths[0]
+
+        seen = array("Q", sorted(set(seen)))
+        with self._lock:
+            if generation != self._generation:
+                return
+            self.groups = {k: v for k, v in groups.items() if len(v) > 1}
+            self.canonical = canonical
+            # Drops files that are no longer in the library
+            self.table.compact(seen)
+
+        if on_done:
+            on_done()
@@ -0,0 +1,75 @@
+# fades.py
+from animation import AnimationClock, shared_clock
+
+
+class FadeDriver:
+    """
+    Fade-in/fade-out for all overlays from one tick of the shared clock.
+
+    Fades run on a 0..1 visibility fraction that is multiplied by the live
+    config["opacity"] on every tick, so set_opacity() during a fade is
+    honoured. `apply(overlay, opacity)` is how a value reaches the screen;
+    it defaults to the per-window setWindowOpacity.
+    """
+
+    def __init__(self, config, apply=None):
+        self.config = config
+        self.apply = apply or (lambda overlay, opacity: overlay.setWindowOpacity(opacity))
+        self.fades = {}   # overlay -> [start_ms, duration_ms, from, to, on_done]
+
+    def _durations(self):
+        fade = self.config.get("fade", {})
+        return fade.get("in_ms", 0), fade.get("out_ms", 0)
+
+    def is_fading(self, overlay):
+        return overlay in self.fades
+
+    def fade_in(self, overlay):
+        duration, _ = self._durations()
+        self._start(overlay, duration, 0.0, 1.0, None)
+
+    def fade_out(self, overlay, on_done):
+        _, duration = self._durations()
+        current = self.fades.get(overlay)
+        start_from = self._fraction(current, AnimationClock.now_ms()) if current else 1.0
+        self._start(overlay, duration, start_from, 0.0, on_done)
+
+    def cancel(self, overlay):
+        self.fades.pop(overlay, None)
+        if not self.fades:
+            shared_clock().unsubscribe(self)
+
+    def _start(self, overlay, duration, start_from, to, on_done):
+        if duration <= 0:
+            self.cancel(overlay)
+            self.apply(overlay, to * self.config["opacity"])
+            if on_done:
+                on_done()
+            return
+
+        self.fades[overlay] = [AnimationClock.now_ms(), duration, start_from, to, on_done]
+        self.apply(overlay, start_from * self.config["opacity"])
+        shared_clock().subscribe(self)
+
+    @staticmethod
+    def _fraction(fade, now):
+        start, duration, start_from, to, _ = fade
+        progress = min(1.0, (now - start) / duration)
+        return start_from + (to - start_from) * progress
+
+    def tick(self, now):
+        opacity = self.config["opacity"]
+        finished = []
+
+        for overlay, fade in self.fades.items():
+            self.apply(overlay, self._fraction(fade, now) * opacity)
+            if now - fade[0] >= fade[1]:
+                finished.append((overlay, fade[4]))
+
+        for overlay, on_done in finished:
+            del self.fades[overlay]
+            if on_done:
+                on_done()
+
+        if not self.fades:
+            shared_clock().unsubscribe(self)
@@ -0,0 +1,71 @@
+# failures.py
+import os
+import time
+
+from jsonstore import read_json, write_json_atomic
+
+
+class FailureIndex:
+    """
+    Persistent record of media files that failed to load.
+
+    A file that failed MAX_FAILURES times is quarantined until its mtime
+    changes (i.e. the file was replaced or repaired on disk).
+    """
+
+    MAX_FAILURES = 2
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        self.entries = read_json(self.index_file, {})
+
+    def save(self):
+        write_json_atomic(self.index_file, self.entries, indent=4)
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def record(self, path, error):
+        mtime = self._mtime(path)
+        entry = self.entries.get(path)
+
+        # A modified file starts with a clean slate
+        if not entry or entry["mtime"] != mtime:
+            entry = {"count": 0, "mtime": mtime}
+
+        entry["count"] += 1
+        entry["error"] = error
+        entry["last_failure"] = time.time()
+        self.entries[path] = entry
+
+        print(f"[Media] Failed to load {path} ({entry['count']}x): {error}")
+        self.save()
+
+    def clear(self, path):
+        if self.entries.pop(path, None) is not None:
+            self.save()
+
+    def clear_all(self):
+        self.entries = {}
+        self.save()
+
+    def is_quarantined(self, path):
+        entry = self.entries.get(path)
+        if not entry or entry["count"] < self.MAX_FAILURES:
+            return False
+
+        # Retry once the file has changed on disk
+        return entry["mtime"] == self._mtime(path)
+
+    def as_list(self):
+        return [
+            {"path": path, **entry}
+            for path, entry in list(self.entries.items())
+        ]
@@ -0,0 +1,313 @@
+# filters.py
+import os
+import random
+from array import array
+
+
+SIZE_CLASSES = (
+    (1024 * 1024, "small"),
+    (20 * 1024 * 1024, "medium"),
+    (float("inf"), "large"),
+)
+ATTRIBUTES = ("folder", "tag", "ext", "size")
+
+
+def read_tags(sidecar):
+    """Tags from a sidecar file: comma and/or newline separated."""
+    try:
+        with open(sidecar, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return set()
+    return {t.strip().lower() for t in text.replace("\n", ",").split(",") if t.strip()}
+
+
+def normalize_folder(path):
+    """Folder as posted and compared: no trailing or doubled separators,
+    native separators and, on Windows, case-folded."""
+    return os.path.normcase(os.path.normpath(path))
+
+
+def validate_filters(filters):
+    """
+    Checked copy of a filter spec (see FilterIndex) with the non-empty
+    clauses only and values in posting form. raises: ValueError
+    """
+    filters = filters or {}
+    if not isinstance(filters, dict) or set(filters) - {"include", "exclude"}:
+        raise ValueError("filters take only 'include' and 'exclude'")
+
+    checked = {}
+    for part in ("include", "exclude"):
+        clauses = filters.get(part) or {}
+        if not isinstance(clauses, dict):
+            raise ValueError(f"'{part}' must map attributes to lists of values")
+
+        checked[part] = {}
+        for attr, values in clauses.items():
+            if attr not in ATTRIBUTES:
+                raise ValueError(f"unknown filter attribute {attr!r} (one of {', '.join(ATTRIBUTES)})")
+            if not isinstance(values, list):
+                raise ValueError(f"{part}.{attr} must be a list of values, got {values!r}")
+
+            if attr == "folder":
+                if not all(isinstance(v, str) and v for v in values):
+                    raise ValueError(f"{part}.folder values must be folder paths")
+                values = [normalize_folder(v) for v in values]
+            else:
+                values = [str(v).lower() for v in values]
+                if attr == "size" and set(values) - {label for _, label in SIZE_CLASSES}:
+                    raise ValueError(f"{part}.size values must be small, medium or large")
+            if values:
+                checked[part][attr] = values
+    return checked
+
+
+def _bitset(indices, count):
+    bits = bytearray((count + 7) // 8)
+    for i in indices:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _value_matches(attr, actual, value):
+    """`value` in posting form (see validate_filters)."""
+    if attr == "folder":
+        return actual == value or actual.startswith(value.rstrip(os.sep) + os.sep)
+    if attr == "tag":
+        return value in actual
+    return actual == value
+
+
+def _matches(attrs, include, exclude):
+    """Whether one file's attributes pass the filters."""
+    for attr, values in include.items():
+        if not any(_value_matches(attr, attrs.get(attr), v) for v in values):
+            return False
+    for attr, values in exclude.items():
+        if any(_value_matches(attr, attrs.get(attr), v) for v in values):
+            return False
+    return True
+
+
+def _members(bits):
+    members = array("I")
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for byte_index, byte in enumerate(data):
+        if byte:
+            base = byte_index * 8
+            for bit in range(8):
+                if byte >> bit & 1:
+                    members.append(base + bit)
+    return members
+
+
+class FilterIndex:
+    """
+    Attribute index over a library pool ({type: PathStore}).
+
+    Posting lists are kept per (type, attribute, value) for:
+    - folder: the entry's directory (normalize_folder); a folder filter
+      matches that directory and everything below it
+    - tag:    tags from "<file>.tags" sidecars and from ".tags" files in
+      the entry's directory or any parent directory
+    - ext:    lower-case extension
+    - size:   "small" / "medium" / "large" (SIZE_CLASSES)
+
+    apply() turns active filters into one candidate array per type using
+    bitset intersections, so choose() stays O(1) and never scans the pool.
+
+    Filter format (config["filters"]):
+        {"include": {attr: [values]}, "exclude": {attr: [values]}}
+    An entry must match at least one value of every included attribute and
+    none of the excluded values.
+
+    An entry that stands for several identical files (`copies`, after
+    duplicates were collapsed) is posted under the attributes of all of
+    them, then checked copy by copy in apply(); choose() returns a copy
+    that matches.
+    """
+
+    def __init__(self, pool, sidecars, sizes, copies=None):
+        """
+        sidecars: {target path or directory: sidecar path}
+        sizes:    callable(path) -> file size in bytes, or None
+        copies:   callable(path) -> every path with the same content
+        """
+        self.pool = pool
+        self.postings = {}
+        self.copies = {}          # type -> {entry: [(path, attrs)]}, multi-copy entries only
+        self.candidates = None
+        self._copy_matches = {}   # type -> {entry: [matching paths]}
+        self._bitsets = {}
+
+        for media_type, store in pool.items():
+            self.postings[media_type], self.copies[media_type] = self._build(
+                store, sidecars, sizes, copies
+            )
+
+    def _build(self, store, sidecars, sizes, copies):
+        postings = {attr: {} for attr in ATTRIBUTES}
+        multi = {}
+
+        def post(attr, value, i):
+            postings[attr].setdefault(value, array("I")).append(i)
+
+        # Directory tags (inherited from parents) and normalized folder
+        # names are resolved once per dir
+        dir_tags = {}
+        folders = {}
+
+        def tags_of_dir(directory):
+            if directory in dir_tags:
+                return dir_tags[directory]
+            parent = os.path.dirname(directory)
+            tags = set(tags_of_dir(parent)) if parent and parent != directory else set()
+            if directory in sidecars:
+                tags |= read_tags(sidecars[directory])
+            dir_tags[directory] = tags
+            return tags
+
+        def attributes(directory, name, size_class):
+            path = os.path.join(directory, name)
+            tags = tags_of_dir(directory)
+            if path in sidecars:
+                tags = tags | read_tags(sidecars[path])
+            folder = folders.get(directory)
+            if folder is None:
+                folder = folders[directory] = normalize_folder(directory)
+            return path, {
+                "folder": folder,
+                "tag": tags,
+                "ext": name.lower().rsplit(".", 1)[-1],
+                "size": size_class,
+            }
+
+        for i in range(len(store)):
+            directory = store.directory(i)
+            name = store.name(i)
+            path = os.path.join(directory, name)
+
+            size = sizes(path)
+            size_class = None
+            if size is not None:
+                size_class = next(label for limit, label in SIZE_CLASSES if size < limit)
+
+            group = copies(path) if copies else None
+            if group and len(group) > 1:
+                files = [attributes(*os.path.split(p), size_class) for p in group]
+                multi[i] = files
+            else:
+                files = [attributes(directory, name, size_class)]
+
+            # Union over copies; each value is posted once per entry
+            for attr in ATTRIBUTES:
+                values = set()
+                for _, attrs in files:
+                    value = attrs[attr]
+                    if attr == "tag":
+                        values |= value
+                    elif value is not None:
+                        values.add(value)
+                for value in values:
+                    post(attr, value, i)
+
+        return postings, multi
+
+    # ---------- queries ----------
+
+    def values(self):
+        """Known values per attribute with entry counts, across all types."""
+        values = {attr: {} for attr in ATTRIBUTES}
+        for postings in self.postings.values():
+            for attr, by_value in postings.items():
+                for value, entries in by_value.items():
+                    values[attr][value] = values[attr].get(value, 0) + len(entries)
+        return values
+
+    def _value_bits(self, media_type, attr, value):
+        key = (media_type, attr, value)
+        bits = self._bitsets.get(key)
+        if bits is None:
+            count = len(self.pool[media_type])
+            by_value = self.postings[media_type][attr]
+
+            if attr == "folder":
+                # The folder itself and every directory below it, gathered
+                # first so the bitset is built once
+                indices = array("I")
+                for directory, entries in by_value.items():
+                    if _value_matches("folder", directory, value):
+                        indices.extend(entries)
+                bits = _bitset(indices, count)
+            else:
+                bits = _bitset(by_value.get(value, ()), count)
+
+            self._bitsets[key] = bits
+        return bits
+
+    def _attr_bits(self, media_type, attr, values):
+        bits = 0
+        for value in values:
+            bits |= self._value_bits(media_type, attr, value)
+        return bits
+
+    def apply(self, filters):
+        """
+        Recompute the candidates for `filters`; falsy filters disable.
+        raises: ValueError for an invalid spec (see validate_filters)
+        """
+        checked = validate_filters(filters)
+        include, exclude = checked["include"], checked["exclude"]
+
+        if not include and not exclude:
+            self.candidates = None
+            self._copy_matches = {}
+            return
+
+        candidates = {}
+        copy_matches = {}
+        for media_type, store in self.pool.items():
+            bits = (1 << len(store)) - 1
+            for attr, values in include.items():
+                bits &= self._attr_bits(media_type, attr, values)
+            for attr, values in exclude.items():
+                bits &= ~self._attr_bits(media_type, attr, values)
+            members = _members(bits)
+
+            # Multi-copy entries pass if any single copy passes
+            multi = self.copies[media_type]
+            if multi:
+                matches = {}
+                for i, files in multi.items():
+                    matching = [path for path, attrs in files if _matches(attrs, include, exclude)]
+                    if matching:
+                        matches[i] = matching
+                members = array("I", (i for i in members if i not in multi))
+                members.extend(matches)
+                copy_matches[media_type] = matches
+
+            candidates[media_type] = members
+
+        self._copy_matches = copy_matches
+        self.candidates = candidates
+
+    @property
+    def active(self):
+        return self.candidates is not None
+
+    def count(self, media_type):
+        if self.candidates is None:
+            return len(self.pool[media_type])
+        return len(self.candidates[media_type])
+
+    def choose(self, media_type):
+        candidates = self.candidates[media_type]
+        if not candidates:
+            return None
+
+        i = random.choice(candidates)
+        matching = self._copy_matches.get(media_type, {}).get(i)
+        if matching:
+            return random.choice(matching)
+        return self.pool[media_type][i]
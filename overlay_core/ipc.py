@@ -2,6 +2,8 @@ import json
 import socket
 import threading
 
+from schedulers import OVERRIDE_KEYS, screen_key
+
 class IPCServer:
     def __init__(self, manager, host="127.0.0.1", port=51723):
         self.manager = manager
@@ -51,4 +53,58 @@ class IPCServer:
         if name == "set_opacity":
             print("IPC: set_opacity", cmd["value"])
             self.manager.set_opacity(cmd["value"])
+
+        elif name == "get_failures":
+            self._send(conn, {"cmd": "failures", "failures": self.manager.media.failures.as_list()})
+
+        elif name == "clear_failures":
+            self.manager.run_on_ui_thread(self.manager.media.failures.clear_all)
+
+        elif name == "get_filters":
+            index = self.manager.media.filters
+            self._send(conn, {
+                "cmd": "filters",
+                "filters": self.manager.config.get("filters"),
+                "values": index.values() if index else {},
+                "matches": {t: index.count(t) for t in index.pool} if index else {},
+            })
+
+        elif name == "set_filters":
+            filters = cmd.get("filters", {})
+            self.manager.run_on_ui_thread(lambda: self.manager.set_filters(filters))
+
+        elif name == "set_trace":
+            enabled, file = cmd.get("enabled", False), cmd.get("file")
+            self.manager.run_on_ui_thread(lambda: self.manager.set_trace(enabled, file))
+
+        elif name == "get_screens":
+            self.manager.run_on_ui_thread(
+                lambda: self._send(conn, {
+                    "cmd": "screens",
+                    "per_screen": self.manager.schedulers.enabled,
+                    "screens": self.manager.schedulers.state(),
+                    "live": {screen_key(s): len(v) for s, v in self.manager.by_screen.items()},
+                })
+            )
+
+        elif name == "set_per_screen":
+            enabled = cmd.get("enabled", False)
+            self.manager.run_on_ui_thread(lambda: self.manager.set_per_screen(enabled))
+
+        elif name == "set_screen_override":
+            key, settings = cmd["id"], {k: cmd[k] for k in OVERRIDE_KEYS if k in cmd}
+            self.manager.run_on_ui_thread(lambda: self.manager.set_screen_override(key, **settings))
+
+        elif name == "census":
+            # Qt objects are inspected on the UI thread
+            self.manager.run_on_ui_thread(
+                lambda: self._send(conn, {"cmd": "census", "census": self.manager.tracker.census()})
+            )
+
+        elif name == "get_adaptive":
+            self._send(conn, {"cmd": "adaptive", "state": self.manager.adaptive.state()})
+
+        elif name == "set_adaptive":
+            settings = cmd.get("settings", {})
+            self.manager.run_on_ui_thread(lambda: self.manager.set_adaptive(**settings))
         
@@ -0,0 +1,20 @@
+# jsonstore.py
+import json
+import os
+import threading
+
+
+def read_json(path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def write_json_atomic(path, data, **dump_args):
+    """Write via a temp file and os.replace, so a crash never leaves half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, **dump_args), encoding="utf-8")
+    os.replace(tmp, path)
+
@@ -1,6 +1,10 @@
 ﻿# main.py
+from startup import profile
+
 import sys
+import threading
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 
 from config import load_config
 from config import save_config
@@ -10,19 +14,51 @@ from manager import OverlayManager
 from gui import ControlPanel
 from ipc import IPCServer
 
+profile.mark("imports")
+
 
 if __name__ == "__main__":
+    # --startup-benchmark: spawn as soon as the library is ready, print the
+    # phase breakdown and exit after the first overlay (used by bench.py)
+    startup_benchmark = "--startup-benchmark" in sys.argv
+
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
+    profile.mark("qt_app")
 
     config = load_config()
-    media = MediaLibrary(config)
+    profile.mark("config")
+
+    manager = None
+    manager_built = threading.Event()
+
+    def on_library_ready():
+        profile.mark("library")
+        if startup_benchmark:
+            manager_built.wait()
+            manager.run_on_ui_thread(lambda: manager.spawn("random"))
+
+    # Library scan runs in the background; the event loop starts right away
+    media = MediaLibrary(config, on_ready=on_library_ready)
     manager = OverlayManager(config, media)
+    manager_built.set()
+    profile.mark("manager")
 
     # panel = ControlPanel(manager)
     # panel.show()
     ipc_server = IPCServer(manager)
     ipc_server.start()
+    profile.mark("ipc")
+
+    def on_first_overlay(overlay):
+        manager.spawned.disconnect(on_first_overlay)
+        profile.mark("first_overlay")
+        profile.report()
+        if startup_benchmark:
+            app.quit()
+
+    manager.spawned.connect(on_first_overlay)
+    QTimer.singleShot(0, lambda: profile.mark("event_loop"))
 
     app.aboutToQuit.connect(lambda: save_config(manager.config))
     sys.exit(app.exec())
@@ -1,13 +1,22 @@
 # manager.py
 import random
+import time
+from pathlib import Path
 from PySide6.QtCore import QTimer, QObject, Signal, Slot
 from PySide6.QtGui import QGuiApplication
 from copy import deepcopy
 
 from overlays import MediaOverlay
+from placement import PlacementEngine
+from fades import FadeDriver
+from adaptive import AdaptiveController
+from census import OverlayTracker
+from spawntrace import TraceRecorder
+from schedulers import ScreenSchedulers
 
 class OverlayManager(QObject):
     run_on_ui = Signal(object)
+    spawned = Signal(object)
 
     def __init__(self, config, media_library):
         super().__init__()
@@ -16,19 +25,38 @@ class OverlayManager(QObject):
         self.media = media_library
 
         self.overlays = []
+        self.by_screen = {}       # QScreen -> [overlay]
+        self._overlay_screens = {}  # overlay -> QScreen
         self.active = {"image":0, "audio": 0, "video": 0}
+        self.placement = PlacementEngine(config)
+        self.fader = FadeDriver(config)
+        self.adaptive = AdaptiveController(config)
+        self.tracker = OverlayTracker(config)
+        self.trace = None
+        self._apply_trace_config()
         self.run_on_ui.connect(self._run_on_ui)
 
+        self.schedulers = ScreenSchedulers(self)
+        QGuiApplication.instance().screenRemoved.connect(self._on_screen_removed)
+
         self.timer = QTimer()
         self.timer.timeout.connect(self._on_tick)
+        self.schedulers.apply_config()
         self._reset_timer()
 
     def _reset_timer(self):
+        # Per-screen schedulers replace the global timer
+        if self.schedulers.enabled:
+            self.timer.stop()
+            self.schedulers.reset()
+            return
+
         interval = random.randint(
             self.config["spawn"]["interval_min_ms"],
             self.config["spawn"]["interval_max_ms"]
         )
-        self.timer.start(interval)
+        # Stretched while the adaptive controller sees the machine struggling
+        self.timer.start(int(interval * self.adaptive.interval_factor()))
 
     def _on_tick(self):
         self._reset_timer()
@@ -36,14 +64,26 @@ class OverlayManager(QObject):
         if random.random() > self.config["spawn"]["chance"]:
             return
 
+        if self.at_capacity():
+            return
+
          # Stage 2: presentation roll
-        presentation = "random"
-        if random.random() < self.config["spawn"]["fullscreen_chance"]:
-            presentation = "fullscreen"
+        self.spawn(self.roll_presentation(self.config["spawn"]["fullscreen_chance"]))
+
+    def at_capacity(self):
+        max_active = self.adaptive.max_active()
+        return max_active is not None and len(self.overlays) >= max_active
 
-        self.spawn(presentation)
+    @staticmethod
+    def roll_presentation(fullscreen_chance):
+        if random.random() < fullscreen_chance:
+            return "fullscreen"
+        return "random"
 
-    def spawn(self, presentation):
+    def screen_overlays(self, screen):
+        return self.by_screen.get(screen, [])
+
+    def spawn(self, presentation, screen=None):
         allowed = []
 
         for t, cfg in self.config["media"].items():
@@ -57,39 +97,131 @@ class OverlayManager(QObject):
         if not path:
             return
 
-        screen = random.choice(QGuiApplication.screens())
-        geo = screen.availableGeometry()
+        if screen is None:
+            screen, geo = self.placement.choose_screen()
+            if screen is None:
+                return
+        else:
+            geo = self.placement.screens.geometry(screen)
+
+        start = time.perf_counter()
+        overlay = MediaOverlay(
+            path, media_type, self.config,
+            presentation=presentation,
+            meta=self.media.meta.get(path),
+            screen=screen,
+            renditions=self.media.renditions,
+            content_key=self.media.content_key(path),
+            fader=self.fader,
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+
+        if overlay.error:
+            self.media.failures.record(path, overlay.error)
+            if self.trace:
+                self.trace.failure(path, media_type, overlay.error)
+            overlay.deleteLater()
+            return
 
-        overlay = MediaOverlay(path, media_type, self.config, presentation=presentation)
-        overlay.setScreen(screen)
         overlay.closed.connect(self._on_closed)
+        overlay.failed.connect(self._on_failed)
+        overlay.moved.connect(self._on_moved)
 
         overlay.set_interactive(self.config["interactive"])
-        overlay.setWindowOpacity(self.config["opacity"])
 
-        if presentation == "fullscreen":
-            overlay.move(
-                geo.center().x() - overlay.width() // 2,
-                geo.center().y() - overlay.height() // 2,
-            )
-        else:
-            overlay.move(
-                random.randint(geo.x(), geo.right() - overlay.width()),
-                random.randint(geo.y(), geo.bottom() - overlay.height())
-            )
+        overlay.move(self.placement.place(geo, overlay.size(), presentation))
+        self.placement.add(overlay)
+        if self.trace:
+            self.trace.spawn(overlay, build_ms)
 
         self.overlays.append(overlay)
+        self._track_screen(overlay, screen)
+        self.tracker.track(overlay)
         if media_type in self.active:
             self.active[media_type] += 1
 
+        self.spawned.emit(overlay)
+
 
     def _on_closed(self, overlay):
-        if overlay in self.overlays:
-            self.overlays.remove(overlay)
+        if overlay not in self.overlays:
+            return
+        self.overlays.remove(overlay)
+        self._untrack_screen(overlay)
+        self.placement.remove(overlay)
+        self.tracker.closed(overlay)
+        if self.trace:
+            self.trace.close(overlay)
 
         if overlay.media_type in self.active:
             self.active[overlay.media_type] -= 1
 
+        # Only a confirmed load clears the record; an audio/video overlay
+        # closed before its player loaded proves nothing
+        if overlay.loaded and overlay.error is None:
+            self.media.failures.clear(overlay.path)
+
+    def _on_moved(self, overlay):
+        # Dragged by the user: placement must see where it is now
+        if overlay in self.overlays:
+            self.placement.remove(overlay)
+            self.placement.add(overlay)
+
+    def _on_failed(self, overlay, error):
+        self.media.failures.record(overlay.path, error)
+        if self.trace:
+            self.trace.failure(overlay.path, overlay.media_type, error)
+
+    # -------- Per-screen tracking --------
+    def _track_screen(self, overlay, screen):
+        self._overlay_screens[overlay] = screen
+        self.by_screen.setdefault(screen, []).append(overlay)
+
+    def _untrack_screen(self, overlay):
+        screen = self._overlay_screens.pop(overlay, None)
+        overlays = self.by_screen.get(screen)
+        if overlays and overlay in overlays:
+            overlays.remove(overlay)
+            if not overlays:
+                del self.by_screen[screen]
+
+    def _on_screen_removed(self, screen):
+        self.schedulers.remove(screen)
+
+        overlays = list(self.by_screen.get(screen, []))
+        if not overlays:
+            return
+
+        remaining = [(s, geo) for s, geo in self.placement.screens.screens if s is not screen]
+        if self.config.get("screens", {}).get("on_remove", "close") != "migrate" or not remaining:
+            print(f"[Screens] {screen.name()} removed, closing {len(overlays)} overlay(s)")
+            for overlay in overlays:
+                overlay._safe_close()
+            return
+
+        # Largest remaining screen takes the overlays over
+        target, geo = max(remaining, key=lambda item: item[1].width() * item[1].height())
+        print(f"[Screens] {screen.name()} removed, moving {len(overlays)} overlay(s) to {target.name()}")
+
+        for overlay in overlays:
+            self.placement.remove(overlay)
+            self._untrack_screen(overlay)
+
+            overlay.setScreen(target)
+            overlay.move(self.placement.place(geo, overlay.size(), overlay.presentation))
+
+            self.placement.add(overlay)
+            self._track_screen(overlay, target)
+
+    def _apply_trace_config(self):
+        settings = self.config.get("trace", {})
+        if self.trace:
+            self.trace.stop()
+            self.trace = None
+        if settings.get("enabled"):
+            trace_file = settings.get("file")
+            self.trace = TraceRecorder(Path(trace_file) if trace_file else None)
+
     def apply_structural_config(self, new_config):
         """
         Apply configuration changes that are NOT safe to mutate live.
@@ -108,6 +240,7 @@ class OverlayManager(QObject):
         self.media.rescan()
 
         # reset timer if needed
+        self.schedulers.apply_config()
         self._reset_timer()
 
     # ======================
@@ -121,7 +254,9 @@ class OverlayManager(QObject):
 
         def apply():
             for overlay in self.overlays:
-                overlay.setWindowOpacity(value)
+                # Fading overlays pick up the new value on the next fade tick
+                if not self.fader.is_fading(overlay):
+                    overlay.setWindowOpacity(value)
 
         self.run_on_ui_thread(apply)
 
@@ -194,6 +329,41 @@ class OverlayManager(QObject):
         self.config["scale"]["min"] = min_scale
         self.config["scale"]["max"] = max_scale
 
+    # -------- Selection Filters --------
+    def set_filters(self, filters: dict):
+        self.media.set_filters(filters)
+
+    # -------- Spawn Trace --------
+    def set_trace(self, enabled: bool, file=None):
+        """Start (a new session) or stop recording spawns."""
+        self.config["trace"] = {"enabled": enabled, "file": file}
+        self._apply_trace_config()
+
+    # -------- Per-screen Spawning --------
+    def set_per_screen(self, enabled: bool):
+        self.config.setdefault("screens", {})["per_screen"] = enabled
+        self.schedulers.apply_config()
+        self._reset_timer()
+
+    def set_screen_override(self, key: str, **settings):
+        """Per-screen interval/chance/cap; a None value restores the default."""
+        overrides = self.config.setdefault("screens", {}).setdefault("overrides", {})
+        override = overrides.setdefault(key, {})
+        override.update({k: v for k, v in settings.items() if v is not None})
+        for k, v in settings.items():
+            if v is None:
+                override.pop(k, None)
+        if not override:
+            del overrides[key]
+
+        for scheduler in self.schedulers.matching(key):
+            scheduler.reset()
+
+    # -------- Adaptive Spawn Rate --------
+    def set_adaptive(self, **settings):
+        self.config.setdefault("adaptive", {}).update(settings)
+        self.adaptive.apply_config()
+
     # ======================
     # EXPLICIT ACCESSORS PER CONCEPT
     # ======================
@@ -1,39 +1,273 @@
 # media.py
 import os
 import random
+import threading
+
+from config import LIBRARY_DIR
+from probe import MetadataIndex
+from failures import FailureIndex
+from pathstore import PathStore
+from sampler import TreeSampler
+from renditions import RenditionCache
+from content import ContentIndex
+from filters import FilterIndex, validate_filters
+
+
+def open_caches(config):
+    """
+    The metadata index, rendition cache and content index as the live
+    library uses them; renditions/content are None when disabled. The
+    indexes are empty until their load() is called (off the UI thread).
+    """
+    # JSON indexes written by older versions
+    for name in ("metadata.json", "metadata.json.journal", "content.json", "content.json.journal"):
+        try:
+            os.remove(LIBRARY_DIR / name)
+        except OSError:
+            pass
+
+    meta = MetadataIndex(LIBRARY_DIR / "metadata.idx")
+
+    renditions = None
+    settings = config.get("renditions", {})
+    if settings.get("enabled", True):
+        renditions = RenditionCache(
+            LIBRARY_DIR / "renditions", settings.get("max_mb", 2048) * 1024 * 1024
+        )
+
+    content = None
+    if config.get("dedup", {}).get("enabled", True):
+        content = ContentIndex(LIBRARY_DIR / "content.idx")
+
+    return meta, renditions, content
+
 
 class MediaLibrary:
-    IMAGE_EXT = {"jpg", "jpeg", "png", "bmp", "gif"}
+    IMAGE_EXT = {"jpg", "jpeg", "png", "bmp", "gif", "webp"}
     AUDIO_EXT = {"mp3", "wav", "ogg"}
     VIDEO_EXT = {"mp4", "avi", "mkv", "mov"}
 
-    def __init__(self, config):
+    CHOOSE_ATTEMPTS = 8
+
+    def __init__(self, config, on_ready=None):
         self.config = config
-        self.pool = {"image": [], "audio": [], "video": []}
-        self.rescan()
+        self.on_ready = on_ready
+        self.pool = self._empty_pool()
+        self.meta, self.renditions, self.content = open_caches(config)
+        self.failures = FailureIndex(LIBRARY_DIR / "failures.json")
+
+        self.filters = None
+        self._filters_pool = None   # pool the index is built or being built for
+        self._filters_lock = threading.Lock()
+        self._sidecars = {}
+
+        self.ready = False
+        self.sampler = None
+        self._generation = 0
+
+        # The first scan never blocks startup
+        self.rescan(background=True)
 
-    def rescan(self):
-        self.pool = {"image": [], "audio": [], "video": []}
+    @staticmethod
+    def _empty_pool():
+        return {"image": PathStore(), "audio": PathStore(), "video": PathStore()}
 
-        for folder in self.config["media_folders"]:
-            for root, _, files in os.walk(folder):
+    def _ext_types(self):
+        ext_types = {}
+        for media_type, exts in (
+            ("image", self.IMAGE_EXT),
+            ("audio", self.AUDIO_EXT),
+            ("video", self.VIDEO_EXT),
+        ):
+            for ext in exts:
+                ext_types[ext] = media_type
+        return ext_types
+
+    def rescan(self, background=False):
+        """
+        Rebuild the exact index.
+
+        With `background` the index is built on a worker thread and choose()
+        returns nothing until it is ready. In "sample_first" mode the scan is
+        always in the background and picks are served by a TreeSampler
+        meanwhile.
+        """
+        self._generation += 1
+        folders = list(self.config["media_folders"])
+        mode = self.config.get("library", {}).get("mode", "exact")
+
+        if mode == "sample_first":
+            self.ready = False
+            self.sampler = TreeSampler(folders, self._ext_types())
+            threading.Thread(
+                target=self._scan, args=(self._generation, folders, self.sampler), daemon=True
+            ).start()
+        elif background:
+            self.ready = False
+            self.sampler = None
+            threading.Thread(
+                target=self._scan, args=(self._generation, folders), daemon=True
+            ).start()
+        else:
+            self.sampler = None
+            self._scan(self._generation, folders)
+
+    def _scan(self, generation, folders, sampler=None):
+        # Large indexes take a while to read; never on the UI thread at startup
+        self.meta.load()
+        if self.content:
+            self.content.load()
+
+        pool = self._empty_pool()
+        ext_types = self._ext_types()
+        sidecars = {}
+
+        for folder in folders:
+            # Bottom-up, so finished subtree counts can feed the sampler
+            pending = {}
+            for root, dirs, files in os.walk(folder, topdown=False):
+                if generation != self._generation:
+                    return
+
+                counts = {}
                 for f in files:
-                    ext = f.lower().split(".")[-1]
-                    full = os.path.join(root, f)
+                    # Tag sidecars: "<file>.tags" or ".tags" for the whole directory
+                    if f.lower().endswith(".tags"):
+                        target = root if f == ".tags" else os.path.join(root, f[:-5])
+                        sidecars[target] = os.path.join(root, f)
+                        continue
+
+                    media_type = ext_types.get(f.lower().split(".")[-1])
+                    if media_type:
+                        pool[media_type].add(root, f)
+                        counts[media_type] = counts.get(media_type, 0) + 1
+
+                if sampler:
+                    for d in dirs:
+                        for media_type, n in pending.pop(os.path.join(root, d), {}).items():
+                            counts[media_type] = counts.get(media_type, 0) + n
+                    pending[root] = counts
+                    sampler.set_count(root, counts)
 
-                    if ext in self.IMAGE_EXT:
-                        self.pool["image"].append(full)
-                    elif ext in self.AUDIO_EXT:
-                        self.pool["audio"].append(full)
-                    elif ext in self.VIDEO_EXT:
-                        self.pool["video"].append(full)
+        if generation != self._generation:
+            return
+
+        # Swap in the exact index in one step; choose() switches over on its own
+        self.pool = pool
+        self._sidecars = sidecars
+        self.ready = True
+        self.sampler = None
+
+        # Header metadata (dimensions, duration) is filled in the background
+        self.meta.refresh(self.pool)
+
+        # So are content hashes; duplicates leave the pool once known
+        if self.content:
+            self.content.refresh(pool, on_done=lambda: self._collapse_duplicates(generation, pool))
+
+        if self.on_ready:
+            self.on_ready()
+
+        self._rebuild_filters(pool)
+
+    def _file_size(self, path):
+        entry = self.meta.get(path)
+        if entry:
+            return entry["size"]
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return None
+
+    def _rebuild_filters(self, pool):
+        """
+        Index `pool` for filtering in a background thread, only while
+        filters are active; otherwise the index is dropped and built when
+        a filter is set.
+        """
+        checked = self._checked_filters()
+        with self._filters_lock:
+            if not checked or not any(checked.values()):
+                self.filters = None
+                self._filters_pool = None
+                return
+            if pool is self._filters_pool:
+                return  # already being built
+            self._filters_pool = pool
+
+        threading.Thread(target=self._build_filters, args=(pool,), daemon=True).start()
+
+    def _build_filters(self, pool):
+        filters = FilterIndex(
+            pool, self._sidecars, self._file_size,
+            copies=self.content.paths if self.content else None,
+        )
+        with self._filters_lock:
+            # A newer scan, deduplication or turning filters off came first
+            if pool is not self.pool or pool is not self._filters_pool:
+                return
+            filters.apply(self._checked_filters())
+            self.filters = filters
+
+    def _checked_filters(self):
+        """config["filters"] validated; invalid filters (e.g. hand-edited) disable."""
+        try:
+            return validate_filters(self.config.get("filters"))
+        except ValueError as e:
+            print(f"[Media] Ignoring invalid filters: {e}")
+            return None
+
+    def set_filters(self, filters):
+        """Apply tag/folder/ext/size filters live (see FilterIndex)."""
+        try:
+            checked = validate_filters(filters)
+        except ValueError as e:
+            print(f"[Media] Rejected filters: {e}")
+            return
+
+        self.config["filters"] = filters
+        with self._filters_lock:
+            # Changing filters on a current index is bitset work only
+            if self.filters and self.filters.pool is self.pool:
+                self.filters.apply(checked)
+                return
+        self._rebuild_filters(self.pool)
+
+    def _collapse_duplicates(self, generation, pool):
+        deduped = self._empty_pool()
+        removed = 0
+
+        for media_type, store in pool.items():
+            for i in range(len(store)):
+                if generation != self._generation:
+                    return
+                if self.content.is_duplicate(store[i]):
+                    removed += 1
+                else:
+                    deduped[media_type].add(store.directory(i), store.name(i))
+
+        if removed:
+            print(f"[Media] Collapsed {removed} duplicate file(s)")
+            self.pool = deduped
+            self._rebuild_filters(deduped)
+
+    def content_key(self, path):
+        """Cache key shared by identical files, or None if not hashed yet."""
+        return self.content.key(path) if self.content else None
 
     def choose(self, allowed):
         """
         allowed: list[str] e.g. ["image", "audio"]
         returns: (path, type) or (None, None)
         """
-        types = [t for t in allowed if self.pool[t] and self.config["media"][t]["enabled"]]
+        sampler = self.sampler
+        filters = self.filters if self.filters and self.filters.active else None
+        if sampler:
+            types = [t for t in allowed if sampler.may_have(t) and self.config["media"][t]["enabled"]]
+        elif filters:
+            types = [t for t in allowed if filters.count(t) and self.config["media"][t]["enabled"]]
+        else:
+            types = [t for t in allowed if self.pool[t] and self.config["media"][t]["enabled"]]
         # types = [t for t in allowed if self.pool[t]]
         if not types:
             return None, None
@@ -41,4 +275,27 @@ class MediaLibrary:
         weights = [self.config["media"][t]["weight"] for t in types]
         # weights = [self.config["media_weights"][t] for t in types]
         chosen_type = random.choices(types, weights=weights, k=1)[0]
-        return random.choice(self.pool[chosen_type]), chosen_type
+
+        # Skip quarantined files; give up rather than spin if most are bad
+        for _ in range(self.CHOOSE_ATTEMPTS):
+            if sampler:
+                path = sampler.choose(chosen_type)
+            elif filters:
+                path = filters.choose(chosen_type)
+            else:
+                path = random.choice(self.pool[chosen_type])
+
+            if not path:
+                continue
+
+            # A quarantined file may still have healthy copies elsewhere.
+            # With filters active, only the copies they allow are candidates;
+            # filters.choose() already picks among those at random.
+            copies = [path]
+            if self.content and not filters:
+                copies += [c for c in self.content.paths(path) if c != path]
+            for copy in copies:
+                if not self.failures.is_quarantined(copy):
+                    return copy, chosen_type
+
+        return None, None
@@ -5,9 +5,20 @@ import random
 from PySide6 import QtCore
 from PySide6.QtWidgets import QWidget, QLabel, QPushButton
 from PySide6.QtCore import Qt, QTimer, QUrl, Signal
-from PySide6.QtGui import QPixmap
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
+from PySide6.QtGui import QPixmap, QImageReader
+
+from animation import AnimationPlayer, frame_cache, size_bucket
+
+# QtMultimedia pulls in the FFmpeg backends; only load it once audio/video
+# is actually spawned (see _load_multimedia).
+QMediaPlayer = QAudioOutput = QVideoWidget = None
+
+
+def _load_multimedia():
+    global QMediaPlayer, QAudioOutput, QVideoWidget
+    if QMediaPlayer is None:
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+        from PySide6.QtMultimediaWidgets import QVideoWidget
 
 
 # =========================
@@ -15,6 +26,9 @@ from PySide6.QtMultimediaWidgets import QVideoWidget
 # =========================
 
 class OverlayWidget(QWidget):
+    # Emitted once a drag has moved the overlay, on release
+    moved = Signal(object)
+
     def __init__(self, config):
         super().__init__()
         self.config = config
@@ -27,6 +41,7 @@ class OverlayWidget(QWidget):
 
         self._dragging = False
         self._drag_offset = None
+        self._drag_start = None
 
     def _apply_flags(self):
         flags = (
@@ -54,12 +69,15 @@ class OverlayWidget(QWidget):
         if e.button() == Qt.LeftButton:
             self._dragging = True
             self._drag_offset = e.globalPosition().toPoint() - self.pos()
+            self._drag_start = self.pos()
 
     def mouseMoveEvent(self, e):
         if self._dragging:
             self.move(e.globalPosition().toPoint() - self._drag_offset)
 
     def mouseReleaseEvent(self, e):
+        if self._dragging and self.pos() != self._drag_start:
+            self.moved.emit(self)
         self._dragging = False
 
 
@@ -69,17 +87,38 @@ class OverlayWidget(QWidget):
 
 class MediaOverlay(OverlayWidget):
     closed = Signal(object)
+    failed = Signal(object, str)
 
-    def __init__(self, path, media_type, config, *, presentation="random"):
+    def __init__(self, path, media_type, config, *, presentation="random", meta=None,
+                 screen=None, renditions=None, fader=None, content_key=None,
+                 scale=None, lifetime=None):
         super().__init__(config)
 
+        # Set before building: fullscreen sizing depends on the target screen
+        if screen:
+            self.setScreen(screen)
+
         self.path = path
         self.media_type = media_type
+        self.meta = meta or {}
+        self.renditions = renditions
+        self.content_key = content_key
+        self.fader = fader
         self.player = None
+        self.animation = None
+        self._label = None
+        self._lifetime_timer = None
+        self.error = None
+        self.loaded = False     # decoded, or the player reached LoadedMedia
+        self._closing = False
         self.config = config
         self.presentation = presentation
 
-        self.scale = random.uniform(config["scale"]["min"], config["scale"]["max"])
+        # Explicit scale/lifetime replace the random rolls (trace replay)
+        if scale is None:
+            scale = random.uniform(config["scale"]["min"], config["scale"]["max"])
+        self.scale = scale
+        self.lifetime = lifetime
 
         self._close_btn = None
         self.setMouseTracking(True)
@@ -98,7 +137,7 @@ class MediaOverlay(OverlayWidget):
 
     def _scale_to_screen(self, size):
         screen = self.screen()
-        if not screen:
+        if not screen or size.isEmpty():
             return size
 
         screen_size = screen.availableGeometry().size()
@@ -132,6 +171,17 @@ class MediaOverlay(OverlayWidget):
         self._close_btn.move(self.width() - self._close_btn.width() - 4, 4)
 
     def _start_timer(self):
+        if self.lifetime is None:
+            self.lifetime = self._roll_lifetime()
+
+        # Owned by the overlay, so a closed overlay is not kept alive by a
+        # pending single-shot callback
+        self._lifetime_timer = QTimer(self)
+        self._lifetime_timer.setSingleShot(True)
+        self._lifetime_timer.timeout.connect(self._safe_close)
+        self._lifetime_timer.start(int(self.lifetime))
+
+    def _roll_lifetime(self):
         media_config = self.config["media"][self.media_type]
         lifetime_config = media_config["lifetime"]
 
@@ -150,40 +200,184 @@ class MediaOverlay(OverlayWidget):
             bias = 1 + (self.scale - 1) * self.config["size_lifetime_bias"]
             lifetime = int(lifetime / bias)
 
-        QTimer.singleShot(max(1500, int(lifetime)), self._safe_close)
+        # Never outlive the clip itself
+        duration = self.meta.get("duration_ms")
+        if self.media_type in ("audio", "video") and duration:
+            lifetime = min(lifetime, duration)
+
+        return max(1500, int(lifetime))
 
     def _safe_close(self):
+        if self._closing:
+            return
+        self._closing = True
+
+        if self.fader and not self.error:
+            self.fader.fade_out(self, self._finish_close)
+        else:
+            self._finish_close()
+
+    def _finish_close(self):
+        if self._lifetime_timer:
+            self._lifetime_timer.stop()
+        if self.fader:
+            self.fader.cancel(self)
         if self.player:
             self.player.stop()
+        if self.animation:
+            self.animation.stop()
         self.closed.emit(self)
         self.deleteLater()
 
+    def resources(self):
+        """Native resources held by this overlay, for leak accounting."""
+        pix = self._label.pixmap() if self._label else None
+        pixmap_bytes = 0
+        if pix and not pix.isNull():
+            pixmap_bytes = pix.width() * pix.height() * pix.depth() // 8
+
+        return {
+            "path": self.path,
+            "media_type": self.media_type,
+            "presentation": self.presentation,
+            "pixmap_bytes": pixmap_bytes,
+            "animated": self.animation is not None,
+            "player": self.player is not None,
+            "audio_output": bool(self.player and self.player.audioOutput()),
+            "native_window": int(self.effectiveWinId()) if self.windowHandle() else None,
+        }
+
+    def _on_player_error(self, error, message):
+        if self.error or self._closing:
+            return
+
+        self.error = message or str(error)
+        self.failed.emit(self, self.error)
+        self._safe_close()
+
+    def _on_media_status(self, status):
+        if status == QMediaPlayer.LoadedMedia:
+            self.loaded = True
+            self.player.play()
+        elif status in (QMediaPlayer.BufferingMedia, QMediaPlayer.BufferedMedia):
+            self.loaded = True
+        elif status == QMediaPlayer.EndOfMedia:
+            self._safe_close()
+        elif status == QMediaPlayer.InvalidMedia:
+            self._on_player_error(status, "invalid media")
+
+    def _is_animated(self):
+        if "frames" in self.meta:
+            return self.meta["frames"] > 1
+        if self.path.lower().rsplit(".", 1)[-1] not in ("gif", "webp"):
+            return False
+
+        reader = QImageReader(self.path)
+        return reader.supportsAnimation() and reader.imageCount() != 1
+
+    def _target_size(self, size):
+        base_size = size * self.scale
+
+        if self.presentation == "fullscreen":
+            base_size = self._scale_to_screen(base_size)
+        return base_size
+
+    def _load_image(self):
+        if "width" in self.meta and "height" in self.meta:
+            target = self._target_size(QtCore.QSize(self.meta["width"], self.meta["height"]))
+
+            if self.renditions:
+                pix = self.renditions.lookup(
+                    self.path, target,
+                    screen=self.screen() if self.presentation == "fullscreen" else None,
+                    key=self.content_key,
+                )
+                if pix is not None:
+                    return pix
+
+            # Size is known from the header: decode straight to the target size
+            reader = QImageReader(self.path)
+            reader.setScaledSize(target)
+            pix = QPixmap.fromImageReader(reader)
+
+            if pix.isNull():
+                self.error = reader.errorString()
+            return pix
+
+        pix = QPixmap(self.path)
+
+        if pix.isNull():
+            self.error = "could not decode image"
+            return pix
+
+        return pix.scaled(self._target_size(pix.size()), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    def _load_animation(self, label):
+        if "width" in self.meta and "height" in self.meta:
+            size = QtCore.QSize(self.meta["width"], self.meta["height"])
+        else:
+            size = QImageReader(self.path).size()
+
+        if not size.isValid() or size.isEmpty():
+            self.error = "could not read animation size"
+            return QPixmap()
+
+        # Frames are decoded once per size bucket and shared between overlays
+        shared = frame_cache(self.config).get(
+            self.path, size_bucket(self._target_size(size)), key=self.content_key
+        )
+        self.animation = AnimationPlayer(label, shared)
+
+        pix = self.animation.first_frame()
+        if pix.isNull():
+            self.error = "could not decode animation"
+            self.animation = None
+        return pix
+
     def _build(self):
+        """
+        Build the overlay contents. If the media cannot be decoded, `error`
+        is set and the overlay is left unshown for the caller to discard.
+        """
         config = self.config
 
         if self.media_type == "image":
             label = QLabel(self)
-            pix = QPixmap(self.path)
-
-            base_size = pix.size() * self.scale
+            self._label = label
 
-            if self.presentation == "fullscreen":
-                base_size = self._scale_to_screen(base_size)
+            if self._is_animated():
+                pix = self._load_animation(label)
+            else:
+                pix = self._load_image()
 
-            
-            pix = pix.scaled(base_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            if pix.isNull():
+                return
 
             label.setPixmap(pix)
-            self.resize(pix.size())
+            self.loaded = True
+            self.resize(pix.deviceIndependentSize().toSize())
+
+            if self.animation:
+                self.animation.start()
 
         else:
+            _load_multimedia()
+
             widget = (
                 QVideoWidget(self)
                 if self.media_type == "video"
                 else QLabel(os.path.basename(self.path), self)
             )
 
-            base_size = QtCore.QSize(int(500 * self.scale),int(300 * self.scale))
+            base_size = QtCore.QSize(500, 300)
+
+            if self.media_type == "video" and self.meta.get("width") and self.meta.get("height"):
+                # Fit the real aspect ratio into the default box
+                base_size = QtCore.QSize(self.meta["width"], self.meta["height"]).scaled(
+                    base_size, Qt.KeepAspectRatio
+                )
+
+            base_size = base_size * self.scale
             
             if self.presentation == "fullscreen" and self.media_type == "video":
                 base_size = self._scale_to_screen(base_size)
@@ -202,15 +396,14 @@ class MediaOverlay(OverlayWidget):
             if self.media_type == "video":
                 self.player.setVideoOutput(widget)
 
+            self.player.errorOccurred.connect(self._on_player_error)
+            self.player.mediaStatusChanged.connect(self._on_media_status)
             self.player.setSource(QUrl.fromLocalFile(self.path))
-            self.player.mediaStatusChanged.connect(
-                lambda st: self.player.play() if st == QMediaPlayer.LoadedMedia else None
-            )
-            self.player.mediaStatusChanged.connect(
-                lambda st: self._safe_close() if st == QMediaPlayer.EndOfMedia else None
-            )
 
         self._add_close_button()
         self._position_close_button()
         self._start_timer()
+
+        if self.fader:
+            self.fader.fade_in(self)
         self.show()
@@ -0,0 +1,200 @@
+# packed.py
+import hashlib
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+_HEADER = struct.Struct("<4sH")   # magic, record format length
+_MAGIC = b"OPT1"
+_ID = struct.Struct("<Q")
+
+
+def path_id(path):
+    """Stable 64-bit id of a path (hash() is salted per process)."""
+    digest = hashlib.blake2b(path.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class PackedTable:
+    """
+    Persistent map of 64-bit path ids to fixed-size records.
+
+    Records live in one sorted array of ids and one contiguous buffer of
+    struct-packed values: 8 bytes plus the record size per entry, instead
+    of a path string and a dict per file. Loading is two bulk copies.
+
+    put() keeps new records in `pending` (merged in at least every
+    MERGE_EVERY puts)
+    and appends them to "<file>.journal", so an interrupted run keeps its
+    progress. compact() merges, drops ids that were not seen and rewrites
+    the snapshot atomically, once per refresh.
+    """
+
+    MERGE_EVERY = 100_000
+    FLUSH_S = 2.0
+
+    def __init__(self, path, fmt):
+        if not fmt.startswith("<"):
+            raise ValueError("record format must be little-endian ('<...')")
+        self.path = path
+        self.journal_path = path.with_name(path.name + ".journal")
+        self.record = struct.Struct(fmt)
+        self.pending = {}
+        self.loaded = False
+        self._table = (array("Q"), b"")
+        self._journal = None
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._table[0]) + len(self.pending)
+
+    def nbytes(self):
+        keys, values = self._table
+        return keys.itemsize * len(keys) + len(values)
+
+    # ---------- persistence ----------
+
+    def ensure_loaded(self):
+        """load() once; until then lookups see an empty table."""
+        with self._lock:
+            if not self.loaded:
+                self.load()
+                self.loaded = True
+
+    def load(self):
+        fmt = self.record.format.encode()
+        keys, values = array("Q"), b""
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            data = b""
+
+        if len(data) >= _HEADER.size:
+            magic, fmt_len = _HEADER.unpack_from(data)
+            pos = _HEADER.size + fmt_len
+            if magic == _MAGIC and data[_HEADER.size:pos] == fmt and len(data) >= pos + 8:
+                count = _ID.unpack_from(data, pos)[0]
+                pos += 8
+                end = pos + 8 * count
+                if len(data) == end + count * self.record.size:
+                    keys.frombytes(data[pos:end])
+                    values = data[end:]
+
+        pending = {}
+        step = _ID.size + self.record.size
+        try:
+            journal = self.journal_path.read_bytes()
+        except OSError:
+            journal = b""
+        for pos in range(0, len(journal) - step + 1, step):   # a torn tail is skipped
+            pending[_ID.unpack_from(journal, pos)[0]] = self.record.unpack_from(journal, pos + _ID.size)
+
+        self._table = (keys, values)
+        self.pending = pending
+
+    def _write_snapshot(self):
+        keys, values = self._table
+        fmt = self.record.format.encode()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(fmt)) + fmt + _ID.pack(len(keys)))
+            f.write(keys.tobytes())
+            f.write(values)
+        os.replace(tmp, self.path)
+
+    # ---------- access ----------
+
+    def get(self, key):
+        record = self.pending.get(key)
+        if record is not None:
+            return record
+
+        keys, values = self._table
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return self.record.unpack_from(values, i * self.record.size)
+        return None
+
+    def put(self, key, record):
+        packed = self.record.pack(*record)
+        with self._lock:
+            self.pending[key] = record
+            if self._journal is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_path, "ab")
+            self._journal.write(_ID.pack(key) + packed)
+
+            now = time.monotonic()
+            if now - self._last_flush > self.FLUSH_S:
+                self._journal.flush()
+                self._last_flush = now
+
+            # Grows with the table, so a cold fill costs O(n) merge work in total
+            if len(self.pending) >= max(self.MERGE_EVERY, len(self._table[0])):
+                self._merge()
+
+    def _merge(self, seen=None):
+        """
+        Fold `pending` into the table; with `seen` (sorted array of ids),
+        drop every id not in it. returns: whether the table changed
+        """
+        keys, values = self._table
+        pending = self.pending
+        size = self.record.size
+
+        if not pending and (seen is None or seen == keys):
+            return False
+
+        new_keys = array("Q")
+        new_values = bytearray()
+        pending_keys = sorted(pending)
+        i = j = k = 0
+        n, m = len(keys), len(pending_keys)
+
+        while i < n or j < m:
+            if j >= m or (i < n and keys[i] < pending_keys[j]):
+                key = keys[i]
+                record = values[i * size:(i + 1) * size]
+                i += 1
+            else:
+                key = pending_keys[j]
+                record = self.record.pack(*pending[key])
+                if i < n and keys[i] == key:
+                    i += 1
+                j += 1
+
+            if seen is not None:
+                while k < len(seen) and seen[k] < key:
+                    k += 1
+                if k >= len(seen) or seen[k] != key:
+                    continue
+
+            new_keys.append(key)
+            new_values += record
+
+        # One assignment, so readers on other threads see old or new
+        self._table = (new_keys, bytes(new_values))
+        self.pending = {}
+        return True
+
+    def compact(self, seen):
+        """Merge, keep only ids in `seen` (sorted array) and rewrite the snapshot."""
+        with self._lock:
+            changed = self._merge(seen)
+            if not changed and self._journal is None and not self.journal_path.exists():
+                return
+
+            self._write_snapshot()
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,57 @@
+# pathstore.py
+import os
+from array import array
+
+
+class PathStore:
+    """
+    Compact, append-only list of file paths.
+
+    Paths are split into a shared directory table and basenames packed into
+    one contiguous buffer, so millions of entries cost a few bytes of
+    overhead each instead of one full `str` per path. Supports len(),
+    O(1) indexing (materialising the path on demand) and iteration, so it
+    can be passed to random.choice() like a list.
+    """
+
+    def __init__(self):
+        self.dirs = []
+        self._dir_ids = {}
+
+        self._names = bytearray()
+        self._offsets = array("Q", [0])
+        self._dir_of = array("I")
+
+    def _dir_id(self, directory):
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self.dirs)
+            self.dirs.append(directory)
+            self._dir_ids[directory] = dir_id
+        return dir_id
+
+    def add(self, directory, name):
+        self._dir_of.append(self._dir_id(directory))
+        self._names += name.encode("utf-8", "surrogatepass")
+        self._offsets.append(len(self._names))
+
+    def name(self, i):
+        return self._names[self._offsets[i]:self._offsets[i + 1]].decode("utf-8", "surrogatepass")
+
+    def directory(self, i):
+        return self.dirs[self._dir_of[i]]
+
+    def __len__(self):
+        return len(self._dir_of)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("PathStore index out of range")
+        return os.path.join(self.dirs[self._dir_of[i]], self.name(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
@@ -0,0 +1,227 @@
+# placement.py
+import random
+
+from PySide6.QtCore import QObject, QPoint, QRect
+from PySide6.QtGui import QGuiApplication
+
+
+# =========================
+# Spatial index
+# =========================
+
+class SpatialGrid:
+    """
+    Uniform grid over global (virtual desktop) coordinates holding the
+    rectangles of live overlays, for fast overlap queries.
+
+    Besides the keys in each cell, the grid keeps the area each cell has
+    covered, so `estimate()` costs one lookup per cell regardless of how
+    many overlays are stacked there.
+    """
+
+    CELL = 256
+
+    def __init__(self):
+        self.cells = {}
+        self.covered = {}
+        self.rects = {}
+
+    def _cells(self, x, y, w, h):
+        c = self.CELL
+        for cx in range(x // c, (x + max(w, 1) - 1) // c + 1):
+            for cy in range(y // c, (y + max(h, 1) - 1) // c + 1):
+                yield cx, cy
+
+    def _cell_area(self, cell, x, y, w, h):
+        c = self.CELL
+        cx, cy = cell[0] * c, cell[1] * c
+        dx = min(x + w, cx + c) - max(x, cx)
+        dy = min(y + h, cy + c) - max(y, cy)
+        return dx * dy if dx > 0 and dy > 0 else 0
+
+    def insert(self, key, x, y, w, h):
+        self.remove(key)
+        self.rects[key] = (x, y, w, h)
+        for cell in self._cells(x, y, w, h):
+            self.cells.setdefault(cell, set()).add(key)
+            self.covered[cell] = self.covered.get(cell, 0) + self._cell_area(cell, x, y, w, h)
+
+    def remove(self, key):
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._cells(*rect):
+            bucket = self.cells.get(cell)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+                    del self.covered[cell]
+                else:
+                    self.covered[cell] -= self._cell_area(cell, *rect)
+
+    def estimate(self, x, y, w, h):
+        """
+        Approximate overlap() assuming coverage is spread evenly inside
+        each cell.
+        """
+        c = self.CELL
+        covered = self.covered
+        right, bottom = x + w, y + h
+        area = 0.0
+
+        # Hot path of least_overlap: _cells()/_cell_area() inlined
+        for cx in range(x // c, (right - 1) // c + 1):
+            dx = min(right, cx * c + c) - max(x, cx * c)
+            for cy in range(y // c, (bottom - 1) // c + 1):
+                amount = covered.get((cx, cy))
+                if amount:
+                    dy = min(bottom, cy * c + c) - max(y, cy * c)
+                    area += amount * dx * dy
+        return area / (c * c)
+
+    def overlap(self, x, y, w, h):
+        """Total area of live rectangles covered by (x, y, w, h)."""
+        seen = set()
+        for cell in self._cells(x, y, w, h):
+            seen.update(self.cells.get(cell, ()))
+
+        area = 0
+        for key in seen:
+            ox, oy, ow, oh = self.rects[key]
+            dx = min(x + w, ox + ow) - max(x, ox)
+            dy = min(y + h, oy + oh) - max(y, oy)
+            if dx > 0 and dy > 0:
+                area += dx * dy
+        return area
+
+    def __len__(self):
+        return len(self.rects)
+
+
+# =========================
+# Position policies
+# =========================
+# policy(grid, geo, w, h, candidates) -> (x, y), geo is the screen's QRect.
+# Overlays larger than the screen are pinned to its top-left corner.
+
+def _random_position(geo, w, h):
+    return (
+        random.randint(geo.x(), max(geo.x(), geo.x() + geo.width() - w)),
+        random.randint(geo.y(), max(geo.y(), geo.y() + geo.height() - h)),
+    )
+
+
+def random_policy(grid, geo, w, h, candidates):
+    return _random_position(geo, w, h)
+
+
+def least_overlap_policy(grid, geo, w, h, candidates):
+    best = None
+    best_area = None
+    for _ in range(max(1, candidates)):
+        x, y = _random_position(geo, w, h)
+        area = grid.estimate(x, y, w, h)
+        if best is None or area < best_area:
+            best, best_area = (x, y), area
+            if area == 0:
+                break
+    return best
+
+
+POSITION_POLICIES = {
+    "random": random_policy,
+    "least_overlap": least_overlap_policy,
+}
+
+
+# =========================
+# Screen cache
+# =========================
+
+class ScreenCache(QObject):
+    """
+    Available geometry of every screen, refreshed from Qt's screen signals
+    instead of being queried on every spawn.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.screens = []
+
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(lambda _: self.refresh())
+
+        for screen in app.screens():
+            self._watch(screen)
+        self.refresh()
+
+    def _watch(self, screen):
+        screen.availableGeometryChanged.connect(lambda _: self.refresh())
+        screen.geometryChanged.connect(lambda _: self.refresh())
+
+    def _on_screen_added(self, screen):
+        self._watch(screen)
+        self.refresh()
+
+    def refresh(self):
+        self.screens = [(s, QRect(s.availableGeometry())) for s in QGuiApplication.screens()]
+
+    def geometry(self, screen):
+        for s, geo in self.screens:
+            if s is screen:
+                return geo
+        return QRect(screen.availableGeometry())
+
+
+# =========================
+# Placement engine
+# =========================
+
+class PlacementEngine:
+    """
+    Chooses a screen and a position for each new overlay and tracks live
+    overlay rectangles in a SpatialGrid.
+
+    config["placement"]:
+        policy:     name in POSITION_POLICIES
+        screen:     "area" (weighted by screen area) or "uniform"
+        candidates: positions tried by least_overlap
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.screens = ScreenCache()
+        self.grid = SpatialGrid()
+
+    def _settings(self):
+        return self.config.get("placement", {})
+
+    def choose_screen(self):
+        screens = self.screens.screens
+        if not screens:
+            return None, None
+
+        if self._settings().get("screen", "area") == "area":
+            weights = [geo.width() * geo.height() for _, geo in screens]
+            return random.choices(screens, weights=weights, k=1)[0]
+        return random.choice(screens)
+
+    def place(self, geo, size, presentation):
+        w, h = size.width(), size.height()
+
+        if presentation == "fullscreen":
+            return QPoint(geo.center().x() - w // 2, geo.center().y() - h // 2)
+
+        settings = self._settings()
+        policy = POSITION_POLICIES.get(settings.get("policy", "least_overlap"), random_policy)
+        x, y = policy(self.grid, geo, w, h, settings.get("candidates", 16))
+        return QPoint(x, y)
+
+    def add(self, overlay):
+        pos, size = overlay.pos(), overlay.size()
+        self.grid.insert(id(overlay), pos.x(), pos.y(), size.width(), size.height())
+
+    def remove(self, overlay):
+        self.grid.remove(id(overlay))
@@ -0,0 +1,397 @@
+# probe.py
+import os
+import struct
+import threading
+from array import array
+
+from PySide6.QtGui import QImageReader
+
+from packed import PackedTable, path_id
+
+
+# =========================
+# Header probes
+# =========================
+# Every probe reads only the container headers and returns a dict with
+# any of: width, height, frames, duration_ms. Unknown fields are omitted.
+
+def probe_image(path):
+    reader = QImageReader(path)
+    size = reader.size()
+    if not size.isValid():
+        return {}
+
+    info = {"width": size.width(), "height": size.height()}
+    if reader.supportsAnimation():
+        info["frames"] = max(1, reader.imageCount())
+    return info
+
+
+def probe_wav(f):
+    head = f.read(12)
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return {}
+
+    byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return {}
+        cid, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+
+        if cid == b"fmt ":
+            fmt = f.read(size + (size & 1))
+            byte_rate = struct.unpack("<I", fmt[8:12])[0]
+        elif cid == b"data":
+            if not byte_rate:
+                return {}
+            return {"duration_ms": int(size * 1000 / byte_rate)}
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def probe_avi(f):
+    head = f.read(4096)
+    if head[:4] != b"RIFF" or head[8:12] != b"AVI ":
+        return {}
+
+    pos = head.find(b"avih")
+    if pos < 0 or len(head) < pos + 48:
+        return {}
+
+    usec_per_frame, _, _, _, total_frames = struct.unpack("<5I", head[pos + 8:pos + 28])
+    width, height = struct.unpack("<2I", head[pos + 40:pos + 48])
+    return {
+        "width": width,
+        "height": height,
+        "duration_ms": int(total_frames * usec_per_frame / 1000),
+    }
+
+
+def _mp4_atoms(data, start, end):
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[pos + 8:pos + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, min(pos + size, end)
+        pos += size
+
+
+def probe_mp4(f, file_size):
+    # Walk top-level atoms until "moov", then read only that atom
+    pos = 0
+    moov = None
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        head = f.read(16)
+        size, kind = struct.unpack(">I4s", head[:8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", head[8:16])[0]
+            header = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header:
+            return {}
+
+        if kind == b"moov":
+            if size > 64 * 1024 * 1024:
+                return {}
+            f.seek(pos + header)
+            moov = f.read(size - header)
+            break
+        pos += size
+
+    if not moov:
+        return {}
+
+    info = {}
+    for kind, start, end in _mp4_atoms(moov, 0, len(moov)):
+        if kind == b"mvhd":
+            if moov[start] == 1:
+                timescale, duration = struct.unpack(">IQ", moov[start + 20:start + 32])
+            else:
+                timescale, duration = struct.unpack(">II", moov[start + 12:start + 20])
+            if timescale:
+                info["duration_ms"] = int(duration * 1000 / timescale)
+
+        elif kind == b"trak":
+            for sub, s_start, _ in _mp4_atoms(moov, start, end):
+                if sub != b"tkhd":
+                    continue
+                # Width/height follow the matrix: payload offset 76 (v0) / 88 (v1)
+                offset = s_start + (88 if moov[s_start] == 1 else 76)
+                width, height = struct.unpack(">II", moov[offset:offset + 8])
+                width, height = width >> 16, height >> 16
+                if width and height and width * height > info.get("width", 0) * info.get("height", 0):
+                    info["width"], info["height"] = width, height
+    return info
+
+
+_MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_RATES = [44100, 48000, 32000]
+
+
+def probe_mp3(f, file_size):
+    head = f.read(10)
+    start = 0
+    if head[:3] == b"ID3":
+        size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        start = 10 + size + (10 if head[5] & 0x10 else 0)
+
+    f.seek(start)
+    data = f.read(16 * 1024)
+
+    # Find the first layer III frame header
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or (data[i + 1] & 0xE6) != 0xE2:
+            continue
+
+        version_bits = (data[i + 1] >> 3) & 0x3
+        bitrate_idx = data[i + 2] >> 4
+        rate_idx = (data[i + 2] >> 2) & 0x3
+        if version_bits == 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+            continue
+
+        mpeg1 = version_bits == 3
+        sample_rate = _MP3_RATES[rate_idx] >> {3: 0, 2: 1, 0: 2}[version_bits]
+        bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_idx] * 1000
+        samples = 1152 if mpeg1 else 576
+        mono = (data[i + 3] >> 6) == 3
+
+        # VBR files carry a Xing/Info (or VBRI) header with the frame count
+        side = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = i + 4 + side
+        if data[xing:xing + 4] in (b"Xing", b"Info"):
+            flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+            if flags & 0x1:
+                frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+                return {"duration_ms": int(frames * samples * 1000 / sample_rate)}
+        vbri = i + 4 + 32
+        if data[vbri:vbri + 4] == b"VBRI":
+            frames = struct.unpack(">I", data[vbri + 14:vbri + 18])[0]
+            return {"duration_ms": int(frames * samples * 1000 / sample_rate)}
+
+        audio_bytes = file_size - (start + i)
+        return {"duration_ms": int(audio_bytes * 8 * 1000 / bitrate)}
+    return {}
+
+
+def probe_ogg(f, file_size):
+    head = f.read(4096)
+    if head[:4] != b"OggS":
+        return {}
+
+    if b"\x01vorbis" in head:
+        pos = head.find(b"\x01vorbis")
+        rate = struct.unpack("<I", head[pos + 12:pos + 16])[0]
+    elif b"OpusHead" in head:
+        rate = 48000
+    else:
+        return {}
+
+    # Granule position of the last page is the total sample count
+    f.seek(max(0, file_size - 65536))
+    tail = f.read()
+    pos = tail.rfind(b"OggS")
+    if pos < 0 or not rate or len(tail) < pos + 14:
+        return {}
+    granule = struct.unpack("<q", tail[pos + 6:pos + 14])[0]
+    return {"duration_ms": int(granule * 1000 / rate)} if granule > 0 else {}
+
+
+def _ebml_vint(data, pos, keep_marker):
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(data):
+        raise ValueError("bad vint")
+
+    value = first if keep_marker else first & (mask - 1)
+    for b in data[pos + 1:pos + length]:
+        value = (value << 8) | b
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, pos + length, unknown
+
+
+def _ebml_elements(data, start, end):
+    pos = start
+    while pos < end:
+        eid, pos, _ = _ebml_vint(data, pos, True)
+        size, pos, unknown = _ebml_vint(data, pos, False)
+        stop = end if unknown else min(pos + size, end)
+        yield eid, pos, stop
+        pos = stop
+
+
+def probe_mkv(f):
+    data = f.read(1024 * 1024)
+    if data[:4] != b"\x1a\x45\xdf\xa3":
+        return {}
+
+    info = {}
+    try:
+        for eid, start, end in _ebml_elements(data, 0, len(data)):
+            if eid != 0x18538067:  # Segment
+                continue
+            timescale = 1000000
+            duration = None
+            for sid, s_start, s_end in _ebml_elements(data, start, end):
+                if sid == 0x1549A966:  # Info
+                    for iid, i_start, i_end in _ebml_elements(data, s_start, s_end):
+                        raw = data[i_start:i_end]
+                        if iid == 0x2AD7B1:
+                            timescale = int.from_bytes(raw, "big")
+                        elif iid == 0x4489:
+                            duration = struct.unpack(">f" if len(raw) == 4 else ">d", raw)[0]
+                elif sid == 0x1654AE6B:  # Tracks
+                    for _, t_start, t_end in _ebml_elements(data, s_start, s_end):
+                        for vid, v_start, v_end in _ebml_elements(data, t_start, t_end):
+                            if vid != 0xE0:  # Video
+                                continue
+                            for pid, p_start, p_end in _ebml_elements(data, v_start, v_end):
+                                if pid == 0xB0:
+                                    info["width"] = int.from_bytes(data[p_start:p_end], "big")
+                                elif pid == 0xBA:
+                                    info["height"] = int.from_bytes(data[p_start:p_end], "big")
+                elif sid == 0x1F43B675:  # Cluster: headers are done
+                    break
+            if duration is not None:
+                info["duration_ms"] = int(duration * timescale / 1000000)
+            break
+    except (ValueError, IndexError, struct.error):
+        pass
+    return info
+
+
+def probe_file(path, media_type):
+    """
+    Read only the headers of a media file.
+    returns: dict (possibly empty if the format is not understood)
+    """
+    if media_type == "image":
+        return probe_image(path)
+
+    ext = path.lower().rsplit(".", 1)[-1]
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        if ext == "wav":
+            return probe_wav(f)
+        if ext == "mp3":
+            return probe_mp3(f, size)
+        if ext == "ogg":
+            return probe_ogg(f, size)
+        if ext == "avi":
+            return probe_avi(f)
+        if ext in ("mp4", "mov"):
+            return probe_mp4(f, size)
+        if ext == "mkv":
+            return probe_mkv(f)
+    return {}
+
+
+# =========================
+# Metadata index
+# =========================
+
+class MetadataIndex:
+    """
+    Persistent path -> header metadata index, filled by a background thread.
+
+    Entries are invalidated by (mtime, size). Lookups never touch the disk,
+    so `get()` is safe to call on every spawn. Entries are packed records
+    keyed by path id (PackedTable, about 40 bytes per file); `get()` builds
+    the dict for one file on demand. The file is read by load(), which the
+    scan and refresh threads call; until then lookups find nothing.
+    """
+
+    # width, height, frames, duration_ms, mtime, size; 0 = unknown
+    RECORD = "<IIIIdQ"
+    FIELDS = ("width", "height", "frames", "duration_ms")
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.table = PackedTable(index_file, self.RECORD)
+        self._generation = 0
+        self._thread = None
+        # Guards the table against a superseded run still finishing a probe
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read the index from disk, once; call it off the UI thread."""
+        self.table.ensure_loaded()
+
+    def get(self, path):
+        record = self.table.get(path_id(path))
+        if record is None:
+            return None
+
+        info = {name: value for name, value in zip(self.FIELDS, record) if value}
+        info["mtime"], info["size"] = record[4], record[5]
+        return info
+
+    def refresh(self, pool):
+        """
+        Probe every file in `pool` ({type: paths}) that is new or changed.
+        A new call supersedes any refresh still running.
+        """
+        self._generation += 1
+        self._thread = threading.Thread(
+            target=self._run, args=(self._generation, pool), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, generation, pool):
+        self.load()
+        seen = array("Q")
+
+        for media_type, paths in pool.items():
+            for path in paths:
+                if generation != self._generation:
+                    return
+
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+
+                key = path_id(path)
+                seen.append(key)
+
+                old = self.table.get(key)
+                if old and old[4] == st.st_mtime and old[5] == st.st_size:
+                    continue
+
+                try:
+                    info = probe_file(path, media_type)
+                except (OSError, ValueError, IndexError, struct.error):
+                    info = {}
+
+                record = [min(max(0, int(info.get(name, 0))), 0xFFFFFFFF) for name in self.FIELDS]
+                record += [st.st_mtime, st.st_size]
+
+                with self._lock:
+                    if generation != self._generation:
+                        return
+                    self.table.put(key, record)
+
+        seen = array("Q", sorted(set(seen)))
+        with self._lock:
+            if generation != self._generation:
+                return
+            # Drops files that are no longer in the library
+            self.table.compact(seen)
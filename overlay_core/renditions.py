@@ -0,0 +1,223 @@
+# renditions.py
+import hashlib
+import mmap
+import os
+import queue
+import struct
+import threading
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+
+# Raw premultiplied ARGB32 behind a small header: loading is a memory map
+# and a copy into a pixmap, no decoding at all.
+_HEADER = struct.Struct("<4sIIIfdQ")   # magic, w, h, bytes/line, dpr, src mtime, src size
+_MAGIC = b"ORC1"
+_CONTENT_KEYED = (0.0, 0)              # source identity of content-keyed files
+_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+class RenditionCache:
+    """
+    Persistent pre-scaled variants of library images.
+
+    Two kinds of variants are kept per image:
+    - size buckets (long edge in BUCKETS), scaled down from on demand
+    - exact fullscreen renditions per screen (available size and device
+      pixel ratio)
+
+    Lookups happen on the UI thread and only read finished files; misses
+    are queued for a single background worker. Files keyed by path record
+    the source mtime/size and are ignored (then regenerated) once they
+    change. Files keyed by a content key are valid for any copy of that
+    content; copies have different mtimes, and the key itself changes
+    when the content does.
+    """
+
+    BUCKETS = (256, 512, 1024, 2048)
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._skipped = set()
+        self._thread = None
+        self._disk_bytes = None
+
+    # ---------- keys ----------
+
+    @staticmethod
+    def screen_key(screen):
+        size = screen.availableGeometry().size()
+        return f"s{size.width()}x{size.height()}@{screen.devicePixelRatio():g}"
+
+    def _file(self, key, variant):
+        digest = hashlib.sha1(key.encode("utf-8", "surrogatepass")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}_{variant}.orc"
+
+    # ---------- lookup (UI thread) ----------
+
+    def lookup(self, path, target, screen=None, key=None):
+        """
+        Return a QPixmap for `path` at `target` size or None on a miss.
+
+        With `screen`, the exact fullscreen rendition for that screen is
+        used (the target is implied by the screen). `key` defaults to the
+        path and identifies the source image in the cache.
+        """
+        key = key or path
+        source = self._source(path, key)
+        if source is None:
+            return None
+
+        if screen is not None:
+            variant = self.screen_key(screen)
+            pix = self._load(self._file(key, variant), source)
+            if pix is None:
+                self._request(path, key, variant, screen_size=screen.availableGeometry().size(),
+                              dpr=screen.devicePixelRatio())
+            return pix
+
+        long_edge = max(target.width(), target.height())
+        for bucket in self.BUCKETS:
+            if bucket < long_edge:
+                continue
+
+            pix = self._load(self._file(key, f"b{bucket}"), source)
+            if pix is None:
+                self._request(path, key, f"b{bucket}", bucket=bucket)
+                return None
+            if pix.size() == target:
+                return pix
+            return pix.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return None
+
+    @staticmethod
+    def _source(path, key):
+        """Identity a cached file is validated against, or None if unreadable."""
+        if key != path:
+            return _CONTENT_KEYED
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def _load(self, file, source):
+        try:
+            with open(file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                magic, w, h, bpl, dpr, mtime, size = _HEADER.unpack_from(m)
+                if magic != _MAGIC or (mtime, size) != source:
+                    return None
+                if len(m) < _HEADER.size + bpl * h:
+                    return None
+
+                view = memoryview(m)[_HEADER.size:_HEADER.size + bpl * h]
+                image = QImage(view, w, h, bpl, _FORMAT)
+                pix = QPixmap.fromImage(image)
+                pix.setDevicePixelRatio(dpr)
+
+                del image
+                view.release()
+                return pix
+        except (OSError, ValueError, BufferError, struct.error):
+            return None
+
+    # ---------- generation (worker thread) ----------
+
+    def _request(self, path, key, variant, **params):
+        job = (key, variant)
+        if job in self._pending or job in self._skipped:
+            return
+        self._pending.add(job)
+        self._queue.put((path, key, variant, params))
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            path, key, variant, params = self._queue.get()
+            try:
+                if not self._generate(path, key, variant, **params):
+                    self._skipped.add((key, variant))
+            except OSError as e:
+                print(f"[Renditions] Failed for {path}: {e}")
+            finally:
+                self._pending.discard((key, variant))
+
+    def _generate(self, path, key, variant, bucket=None, screen_size=None, dpr=1.0):
+        """returns: False if this variant should not exist for the image"""
+        source = self._source(path, key)
+        if source is None:
+            raise FileNotFoundError(path)
+        reader = QImageReader(path)
+        size = reader.size()
+        if not size.isValid() or size.isEmpty():
+            return False
+
+        if bucket is not None:
+            # Never upscale into a bucket; the original is better then
+            if bucket >= max(size.width(), size.height()):
+                return False
+            scaled = size.scaled(QSize(bucket, bucket), Qt.KeepAspectRatio)
+            dpr = 1.0
+        else:
+            logical = size.scaled(screen_size, Qt.KeepAspectRatio)
+            scaled = QSize(round(logical.width() * dpr), round(logical.height() * dpr))
+
+        reader.setScaledSize(scaled)
+        image = reader.read()
+        if image.isNull():
+            return False
+        image = image.convertToFormat(_FORMAT)
+
+        file = self._file(key, variant)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(
+                _MAGIC, image.width(), image.height(), image.bytesPerLine(), dpr, *source,
+            ))
+            f.write(bytes(image.constBits()))
+        os.replace(tmp, file)
+
+        if self._disk_bytes is None:
+            self._disk_bytes = self._prune()
+        else:
+            self._disk_bytes += _HEADER.size + image.sizeInBytes()
+            if self._disk_bytes > self.max_bytes:
+                self._disk_bytes = self._prune()
+        return True
+
+    def _prune(self):
+        """Trim the cache to 90% of max_bytes. returns: bytes left on disk"""
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                file = os.path.join(root, name)
+                try:
+                    st = os.stat(file)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, file))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return total
+
+        # Oldest renditions go first
+        for _, size, file in sorted(files):
+            try:
+                os.remove(file)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes * 0.9:
+                break
+        return total
@@ -0,0 +1,120 @@
+# sampler.py
+import os
+import random
+
+
+class TreeSampler:
+    """
+    Random picks from media folders without a full enumeration.
+
+    Each pick random-walks from a root down the directory tree. At every
+    directory the walk either stops on one of its files or descends into a
+    subdirectory, weighted by how many matching files each option holds:
+    exact subtree counts where the background scan already produced them,
+    otherwise an estimate from the directories listed so far. Listings are
+    cached, so repeated walks only touch the disk for unexplored directories.
+    """
+
+    MAX_DEPTH = 64
+    ATTEMPTS = 4
+
+    def __init__(self, folders, ext_types):
+        self.folders = list(folders)
+        self.ext_types = ext_types
+
+        self.listings = {}   # dir -> ({type: [names]}, [subdirs])
+        self.counts = {}     # dir -> {type: files in subtree}, exact
+
+        self._listed_files = {}
+        self._listed_dirs = 0
+
+    def set_count(self, directory, counts):
+        self.counts[directory] = counts
+
+    def _list(self, directory):
+        listing = self.listings.get(directory)
+        if listing is not None:
+            return listing
+
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    media_type = self.ext_types.get(entry.name.lower().split(".")[-1])
+                    if media_type:
+                        files.setdefault(media_type, []).append(entry.name)
+        except OSError:
+            pass
+
+        for media_type, names in files.items():
+            self._listed_files[media_type] = self._listed_files.get(media_type, 0) + len(names)
+        self._listed_dirs += 1
+
+        listing = (files, subdirs)
+        self.listings[directory] = listing
+        return listing
+
+    def _mean_files(self, media_type):
+        if not self._listed_dirs:
+            return 1.0
+        return max(self._listed_files.get(media_type, 0) / self._listed_dirs, 0.1)
+
+    def _weight(self, directory, media_type):
+        exact = self.counts.get(directory)
+        if exact is not None:
+            return exact.get(media_type, 0)
+
+        listing = self.listings.get(directory)
+        if listing is None:
+            return self._mean_files(media_type)
+
+        files, subdirs = listing
+        return len(files.get(media_type, ())) + len(subdirs) * self._mean_files(media_type)
+
+    def _walk(self, media_type):
+        weights = [self._weight(f, media_type) for f in self.folders]
+        if not any(weights):
+            return None
+        directory = random.choices(self.folders, weights=weights, k=1)[0]
+
+        for _ in range(self.MAX_DEPTH):
+            files, subdirs = self._list(directory)
+            names = files.get(media_type, ())
+
+            sub_weights = [self._weight(d, media_type) for d in subdirs]
+            total = len(names) + sum(sub_weights)
+            if not total:
+                return None
+
+            roll = random.uniform(0, total)
+            if roll < len(names):
+                return os.path.join(directory, names[int(roll)])
+
+            roll -= len(names)
+            for sub, weight in zip(subdirs, sub_weights):
+                if roll < weight:
+                    directory = sub
+                    break
+                roll -= weight
+            else:
+                if not subdirs:
+                    return os.path.join(directory, names[-1])
+                directory = subdirs[-1]
+        return None
+
+    def choose(self, media_type):
+        """
+        returns: path or None (dead end or nothing found)
+        """
+        for _ in range(self.ATTEMPTS):
+            path = self._walk(media_type)
+            if path:
+                return path
+        return None
+
+    def may_have(self, media_type):
+        return any(self._weight(f, media_type) for f in self.folders)
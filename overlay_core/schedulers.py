@@ -0,0 +1,178 @@
+# schedulers.py
+import random
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QGuiApplication
+
+REFERENCE_AREA = 1920 * 1080
+OVERRIDE_KEYS = ("interval_min_ms", "interval_max_ms", "chance", "fullscreen_chance", "max_active")
+
+
+def screen_id(screen):
+    """
+    Identifier that survives reconnects: serial number, else make/model.
+    The connector name is left out, Windows renumbers it on reconnect.
+    Identical monitors can share it; see screen_key().
+    """
+    serial = screen.serialNumber()
+    if serial:
+        return serial
+    return "|".join((screen.manufacturer(), screen.model()))
+
+
+def screen_key(screen):
+    """
+    screen_id(), or "id@x,y" (the screen's position) while another
+    connected screen has the same id, e.g. monitors with duplicate EDID
+    serials.
+    """
+    base = screen_id(screen)
+    if any(s is not screen and screen_id(s) == base for s in QGuiApplication.screens()):
+        geo = screen.geometry()
+        return f"{base}@{geo.x()},{geo.y()}"
+    return base
+
+
+class ScreenScheduler(QObject):
+    """
+    Spawn timer for one screen.
+
+    Defaults come from config["spawn"], with the spawn rate and the overlay
+    cap scaled by the screen's area relative to config["screens"]
+    ["reference_area"], so a 4K wall spawns about four times as often as a
+    1080p side monitor. config["screens"]["overrides"][screen id] replaces
+    any of OVERRIDE_KEYS for that screen; an override for the screen_key()
+    of one of several identical screens takes precedence over it.
+    """
+
+    def __init__(self, manager, screen):
+        super().__init__()
+        self.manager = manager
+        self.screen = screen
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._on_tick)
+
+    @property
+    def key(self):
+        return screen_key(self.screen)
+
+    def matches(self, key):
+        return key in (self.key, screen_id(self.screen))
+
+    def settings(self):
+        config = self.manager.config
+        spawn = config["spawn"]
+        screens = config.get("screens", {})
+
+        geo = self.manager.placement.screens.geometry(self.screen)
+        factor = max(0.1, geo.width() * geo.height() / screens.get("reference_area", REFERENCE_AREA))
+
+        settings = {
+            "interval_min_ms": int(spawn["interval_min_ms"] / factor),
+            "interval_max_ms": int(spawn["interval_max_ms"] / factor),
+            "chance": spawn["chance"],
+            "fullscreen_chance": spawn.get("fullscreen_chance", 0.0),
+            "max_active": max(1, round(screens.get("max_active", 8) * factor)),
+        }
+        overrides = screens.get("overrides", {})
+        settings.update(overrides.get(screen_id(self.screen), {}))
+        if self.key != screen_id(self.screen):
+            settings.update(overrides.get(self.key, {}))
+        return settings
+
+    def reset(self):
+        settings = self.settings()
+        interval = random.randint(
+            settings["interval_min_ms"],
+            max(settings["interval_min_ms"], settings["interval_max_ms"]),
+        )
+        self.timer.start(int(interval * self.manager.adaptive.interval_factor()))
+
+    def stop(self):
+        self.timer.stop()
+
+    def _on_tick(self):
+        self.reset()
+        settings = self.settings()
+
+        if random.random() > settings["chance"]:
+            return
+        if len(self.manager.screen_overlays(self.screen)) >= settings["max_active"]:
+            return
+        if self.manager.at_capacity():
+            return
+
+        self.manager.spawn(self.manager.roll_presentation(settings["fullscreen_chance"]), screen=self.screen)
+
+    def state(self):
+        geo = self.manager.placement.screens.geometry(self.screen)
+        return {
+            "id": self.key,
+            "name": self.screen.name(),
+            "geometry": [geo.x(), geo.y(), geo.width(), geo.height()],
+            "live": len(self.manager.screen_overlays(self.screen)),
+            "settings": self.settings(),
+        }
+
+
+class ScreenSchedulers(QObject):
+    """
+    One ScreenScheduler per connected screen while
+    config["screens"]["per_screen"] is on; otherwise the manager's global
+    timer spawns and this holds nothing. The manager starts the timers
+    (via reset()) after apply_config().
+    """
+
+    def __init__(self, manager):
+        super().__init__()
+        self.manager = manager
+        # Keyed by QScreen: ids are not unique across identical monitors
+        self.schedulers = {}   # QScreen -> ScreenScheduler
+
+        QGuiApplication.instance().screenAdded.connect(self._on_screen_added)
+
+    @property
+    def enabled(self):
+        return self.manager.config.get("screens", {}).get("per_screen", False)
+
+    def apply_config(self):
+        if not self.enabled:
+            for scheduler in self.schedulers.values():
+                scheduler.stop()
+                scheduler.deleteLater()
+            self.schedulers.clear()
+            return
+
+        for screen in QGuiApplication.screens():
+            self._add(screen)
+
+    def reset(self):
+        for scheduler in self.schedulers.values():
+            scheduler.reset()
+
+    def _add(self, screen):
+        if screen in self.schedulers:
+            return None
+        scheduler = ScreenScheduler(self.manager, screen)
+        self.schedulers[screen] = scheduler
+        return scheduler
+
+    def _on_screen_added(self, screen):
+        if self.enabled:
+            scheduler = self._add(screen)
+            if scheduler:
+                scheduler.reset()
+
+    def remove(self, screen):
+        scheduler = self.schedulers.pop(screen, None)
+        if scheduler:
+            scheduler.stop()
+            scheduler.deleteLater()
+
+    def matching(self, key):
+        """Schedulers an override for `key` applies to."""
+        return [s for s in self.schedulers.values() if s.matches(key)]
+
+    def state(self):
+        return [scheduler.state() for scheduler in self.schedulers.values()]
@@ -0,0 +1,273 @@
+# spawntrace.py
+#
+# Record spawn decisions to an append-only trace and replay them.
+# Replay from this directory:  python spawntrace.py TRACE [--speed N]
+import json
+import statistics
+import time
+
+from PySide6.QtCore import QObject, QPoint, QTimer, Signal
+from PySide6.QtGui import QGuiApplication
+
+from config import CONFIG_FILE
+from fades import FadeDriver
+from media import open_caches
+from overlays import MediaOverlay
+
+DEFAULT_TRACE_FILE = CONFIG_FILE.parent / "spawn_trace.jsonl"
+
+# One JSON object per line, short keys:
+#   {"e": "h", "v": 1, "at": wall clock}                      session header
+#   {"e": "s", "t": ms, "i": id, "p": path, "m": type, "pr": presentation,
+#    "sc": scale, "lt": lifetime ms, "scr": screen, "x", "y", "w", "h",
+#    "b": build ms}                                           spawn
+#   {"e": "c", "t": ms, "i": id}                              close
+#   {"e": "f", "t": ms, "p": path, "m": type, "err": error}   failed load
+# `t` is milliseconds since the session header.
+TRACE_VERSION = 1
+
+
+class TraceRecorder:
+    """Appends spawn and close events to a trace file."""
+
+    def __init__(self, trace_file=None):
+        self.trace_file = trace_file or DEFAULT_TRACE_FILE
+        self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Line buffered: a crash loses at most the line being written
+        self._file = open(self.trace_file, "a", encoding="utf-8", buffering=1)
+        self._start = time.monotonic()
+        self._ids = {}
+        self._next_id = 0
+
+        self._write({"e": "h", "v": TRACE_VERSION, "at": round(time.time(), 3)})
+        print(f"[Trace] Recording spawns to {self.trace_file}")
+
+    def _now(self):
+        return round((time.monotonic() - self._start) * 1000)
+
+    def _write(self, event):
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def spawn(self, overlay, build_ms):
+        self._ids[id(overlay)] = self._next_id
+        screen = overlay.screen()
+        pos = overlay.pos()
+
+        self._write({
+            "e": "s", "t": self._now(), "i": self._next_id,
+            "p": overlay.path, "m": overlay.media_type, "pr": overlay.presentation,
+            "sc": round(overlay.scale, 4), "lt": overlay.lifetime,
+            "scr": screen.name() if screen else None,
+            "x": pos.x(), "y": pos.y(), "w": overlay.width(), "h": overlay.height(),
+            "b": round(build_ms, 2),
+        })
+        self._next_id += 1
+
+    def close(self, overlay):
+        trace_id = self._ids.pop(id(overlay), None)
+        if trace_id is not None:
+            self._write({"e": "c", "t": self._now(), "i": trace_id})
+
+    def failure(self, path, media_type, error):
+        self._write({"e": "f", "t": self._now(), "p": path, "m": media_type, "err": error})
+
+    def stop(self):
+        self._file.close()
+
+
+def load_trace(trace_file, session=-1):
+    """Events of one recorded session (default: the last one)."""
+    sessions = []
+    with open(trace_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # torn last line
+            if event.get("e") == "h":
+                sessions.append([])
+            elif sessions:
+                sessions[-1].append(event)
+
+    if not sessions:
+        return []
+    return sorted(sessions[session], key=lambda e: e["t"])
+
+
+class TraceReplayer(QObject):
+    """
+    Drives the real MediaOverlay code from a recorded session.
+
+    Each spawn is rebuilt with the recorded path, presentation, scale,
+    screen, position and lifetime, at the recorded time divided by `speed`.
+    Recorded closes that came earlier than the lifetime (close button,
+    player errors) are replayed as closes. Per spawn, the overlay build
+    time and the scheduling lateness are collected in `timings`.
+    """
+
+    finished = Signal()
+
+    def __init__(self, config, events, speed=1.0):
+        super().__init__()
+        self.config = config
+        self.events = [e for e in events if e["e"] in ("s", "c")]
+        self.speed = speed
+
+        # Same caches the live library uses, without scanning
+        self.meta, self.renditions, self.content = open_caches(config)
+        self.meta.load()
+        if self.content:
+            self.content.load()
+        self.fader = FadeDriver(config)
+
+        self.overlays = {}   # trace id -> overlay
+        self.timings = []
+        self.failures = []
+        self._recorded_build = [e["b"] for e in self.events if e["e"] == "s" and "b" in e]
+        self._index = 0
+        self._start = None
+        self._done = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._step)
+
+    def start(self):
+        self._start = time.monotonic()
+        self._schedule()
+
+    def _elapsed_ms(self):
+        return (time.monotonic() - self._start) * 1000
+
+    def _due_ms(self, event):
+        due = event["t"]
+        if event["e"] == "c":
+            # The recorded close is logged after the fade-out finished
+            due -= self.config.get("fade", {}).get("out_ms", 0)
+        return due / self.speed
+
+    def _schedule(self):
+        if self._index < len(self.events):
+            delay = self._due_ms(self.events[self._index]) - self._elapsed_ms()
+            self.timer.start(max(0, int(delay)))
+        else:
+            self._check_done()
+
+    def _check_done(self):
+        if self._index >= len(self.events) and not self.overlays and not self._done:
+            self._done = True
+            self.finished.emit()
+
+    def _step(self):
+        now = self._elapsed_ms()
+        while self._index < len(self.events):
+            event = self.events[self._index]
+            due = self._due_ms(event)
+            if due > now:
+                break
+            self._index += 1
+
+            if event["e"] == "s":
+                self._spawn(event, now - due)
+            else:
+                overlay = self.overlays.get(event["i"])
+                if overlay and not overlay._closing:
+                    overlay._safe_close()
+
+        self._schedule()
+
+    def _screen(self, name):
+        for screen in QGuiApplication.screens():
+            if screen.name() == name:
+                return screen
+        return QGuiApplication.primaryScreen()
+
+    def _spawn(self, event, late_ms):
+        path = event["p"]
+        start = time.perf_counter()
+        overlay = MediaOverlay(
+            path, event["m"], self.config,
+            presentation=event["pr"],
+            meta=self.meta.get(path),
+            screen=self._screen(event.get("scr")),
+            renditions=self.renditions,
+            content_key=self.content.key(path) if self.content else None,
+            fader=self.fader,
+            scale=event["sc"],
+            lifetime=max(1, int(event["lt"] / self.speed)),
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+
+        if overlay.error:
+            self.failures.append({"path": path, "error": overlay.error})
+            overlay.deleteLater()
+            return
+
+        overlay.set_interactive(self.config["interactive"])
+        overlay.move(QPoint(event["x"], event["y"]))
+        overlay.closed.connect(lambda o, trace_id=event["i"]: self._on_closed(trace_id))
+        self.overlays[event["i"]] = overlay
+
+        self.timings.append({
+            "path": path, "media_type": event["m"],
+            "build_ms": round(build_ms, 2), "late_ms": round(late_ms, 2),
+        })
+
+    def _on_closed(self, trace_id):
+        self.overlays.pop(trace_id, None)
+        self._check_done()
+
+    def report(self):
+        def summary(values):
+            if not values:
+                return "n/a"
+            values = sorted(values)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            return (
+                f"median {statistics.median(values):7.2f}  p95 {p95:7.2f}"
+                f"  max {values[-1]:7.2f} ms"
+            )
+
+        print(f"[Trace] Replayed {len(self.timings)} spawn(s) at {self.speed}x, {len(self.failures)} failed")
+        print(f"[Trace]   build     {summary([t['build_ms'] for t in self.timings])}")
+        print(f"[Trace]   recorded  {summary(self._recorded_build)}")
+        print(f"[Trace]   lateness  {summary([t['late_ms'] for t in self.timings])}")
+        for media_type in sorted({t["media_type"] for t in self.timings}):
+            builds = [t["build_ms"] for t in self.timings if t["media_type"] == media_type]
+            print(f"[Trace]   {media_type:<9} {summary(builds)}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from PySide6.QtWidgets import QApplication
+
+    from config import load_config
+
+    parser = argparse.ArgumentParser(description="Replay a recorded spawn trace.")
+    parser.add_argument("trace", nargs="?", default=str(DEFAULT_TRACE_FILE))
+    parser.add_argument("--speed", type=float, default=1.0, help="time acceleration factor")
+    parser.add_argument("--session", type=int, default=-1, help="session index (default: last)")
+    parser.add_argument("--out", help="write per-spawn timings to this JSON file")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+
+    events = load_trace(args.trace, args.session)
+    if not events:
+        sys.exit(f"[Trace] No recorded session in {args.trace}")
+
+    replayer = TraceReplayer(load_config(), events, speed=args.speed)
+
+    def done():
+        replayer.report()
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"timings": replayer.timings, "failures": replayer.failures}, f, indent=2)
+        app.quit()
+
+    replayer.finished.connect(done)
+    QTimer.singleShot(0, replayer.start)
+    sys.exit(app.exec())
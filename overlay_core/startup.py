@@ -0,0 +1,35 @@
+# startup.py
+#
+# Imported first by main.py so the clock starts before any Qt import.
+import threading
+import time
+
+
+class StartupProfile:
+    """
+    Records named startup milestones as milliseconds since process start.
+    Marks may come from any thread (the library loads in the background).
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.marks = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        with self._lock:
+            if any(n == name for n, _ in self.marks):
+                return
+            self.marks.append((name, (time.perf_counter() - self.t0) * 1000))
+
+    def report(self):
+        with self._lock:
+            marks = sorted(self.marks, key=lambda m: m[1])
+
+        previous = 0.0
+        for name, at in marks:
+            print(f"[Startup] {name:<14} {at:9.1f} ms  (+{at - previous:.1f})")
+            previous = at
+
+
+profile = StartupProfile()